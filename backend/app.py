@@ -11,6 +11,12 @@ from .routes.log_routes import log_bp
 from .routes.dashboard_routes import dashboard_bp
 from .routes.template_routes import template_bp
 from .routes.auth_routes import auth_bp
+from .services.health_monitor import health_monitor
+from .services.invoke_stats import invoke_stats
+from .services.log_writer import log_writer
+from .services.log_search import log_search
+from .services.log_partitions import log_partitions
+from .services.log_sampler import log_sampler
 from flasgger import Swagger
 
 def create_app(config_class=Config):
@@ -62,6 +68,24 @@ def create_app(config_class=Config):
     with app.app_context():
         db.create_all()
     
+    # 建立日志全文索引
+    log_search.init_app(app)
+    
+    # 启动工具健康探测
+    health_monitor.init_app(app)
+    
+    # 启动调用统计的定时写入
+    invoke_stats.init_app(app)
+    
+    # 启动调用日志的批量写入
+    log_writer.init_app(app)
+    
+    # 启动日志分区轮转
+    log_partitions.init_app(app)
+    
+    # 启动日志采样汇总的定时写入
+    log_sampler.init_app(app)
+    
     # 错误处理
     @app.errorhandler(404)
     def not_found(error):
@@ -29,6 +29,166 @@ class Config:
     
     # 每页显示数量
     PER_PAGE = int(os.environ.get('PER_PAGE', 10))
+    
+    # 工具进程启动（MCP握手）超时秒数
+    TOOL_START_TIMEOUT = int(os.environ.get('TOOL_START_TIMEOUT', 30))
+    # 工具调用默认超时秒数（可在工具配置timeout中覆盖），应小于gunicorn的worker超时
+    TOOL_CALL_TIMEOUT = float(os.environ.get('TOOL_CALL_TIMEOUT', 60))
+    # 终止卡死进程时SIGTERM后等待退出的秒数，超时后SIGKILL
+    TOOL_KILL_GRACE = float(os.environ.get('TOOL_KILL_GRACE', 2))
+    # 调用超时或取消后，进程上仍有其他请求时等待其响应ping的秒数，超时才回收进程
+    TOOL_CANCEL_GRACE = float(os.environ.get('TOOL_CANCEL_GRACE', 5))
+    
+    # 工具进程池：激活时预先启动的最少进程数（可在工具配置min_processes中覆盖）
+    TOOL_POOL_MIN = int(os.environ.get('TOOL_POOL_MIN', 1))
+    # 工具进程池：最多进程数（可在工具配置max_processes中覆盖）
+    TOOL_POOL_MAX = int(os.environ.get('TOOL_POOL_MAX', 4))
+    # 工具进程池：多余进程空闲多少秒后回收（可在工具配置idle_timeout中覆盖）
+    TOOL_POOL_IDLE_TIMEOUT = float(os.environ.get('TOOL_POOL_IDLE_TIMEOUT', 300))
+    # 工具进程池：单个进程的并发请求数达到该值时扩容（可在工具配置process_max_inflight中覆盖）
+    TOOL_POOL_MAX_INFLIGHT = int(os.environ.get('TOOL_POOL_MAX_INFLIGHT', 8))
+    # 工具进程池：空闲回收检查间隔秒数
+    TOOL_POOL_REAP_INTERVAL = float(os.environ.get('TOOL_POOL_REAP_INTERVAL', 30))
+    
+    # 是否启用后台健康探测
+    HEALTH_CHECK_ENABLED = os.environ.get('HEALTH_CHECK_ENABLED', 'True') == 'True'
+    # 健康探测间隔秒数
+    HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', 10))
+    # 单次ping超时秒数
+    HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 3))
+    # 连续多少次无响应后把工具设为错误状态
+    HEALTH_FAILURE_THRESHOLD = int(os.environ.get('HEALTH_FAILURE_THRESHOLD', 3))
+    
+    # 调用统计写入数据库的间隔秒数（0表示每次调用立即写入）
+    INVOKE_STATS_FLUSH_INTERVAL = float(os.environ.get('INVOKE_STATS_FLUSH_INTERVAL', 2))
+    
+    # 是否异步批量写入调用日志
+    LOG_ASYNC_ENABLED = os.environ.get('LOG_ASYNC_ENABLED', 'True') == 'True'
+    # 日志写入队列容量
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    # 单次批量写入的最大日志条数
+    LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', 500))
+    # 攒批等待的最长秒数
+    LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 1.0))
+    # 日志队列已满时的处理策略：sync（调用线程直接写入）、block（等待后丢弃）、drop（立即丢弃）
+    LOG_OVERFLOW_POLICY = os.environ.get('LOG_OVERFLOW_POLICY', 'sync')
+    # block策略下的最长等待秒数
+    LOG_ENQUEUE_TIMEOUT = float(os.environ.get('LOG_ENQUEUE_TIMEOUT', 0.1))
+    # 进程退出时等待日志写完的最长秒数
+    LOG_SHUTDOWN_TIMEOUT = float(os.environ.get('LOG_SHUTDOWN_TIMEOUT', 5))
+    # 批量写入遇到数据库锁定等临时错误时的重试次数
+    LOG_WRITE_RETRIES = int(os.environ.get('LOG_WRITE_RETRIES', 5))
+    # 首次重试前等待的秒数，之后每次加倍
+    LOG_WRITE_RETRY_DELAY = float(os.environ.get('LOG_WRITE_RETRY_DELAY', 0.2))
+    
+    # 清除日志时每批删除的条数
+    LOG_DELETE_BATCH_SIZE = int(os.environ.get('LOG_DELETE_BATCH_SIZE', 5000))
+    # 清除日志时批次之间的间隔秒数
+    LOG_DELETE_PAUSE = float(os.environ.get('LOG_DELETE_PAUSE', 0.05))
+    
+    # 日志分区周期：none（不分区）、day 或 month
+    LOG_PARTITION_PERIOD = os.environ.get('LOG_PARTITION_PERIOD', 'none')
+    
+    # 检查分区轮转和保留期限的间隔秒数
+    LOG_PARTITION_CHECK_INTERVAL = float(os.environ.get('LOG_PARTITION_CHECK_INTERVAL', 300))
+    
+    # 进入新周期后延迟轮转的秒数
+    LOG_PARTITION_GRACE = float(os.environ.get('LOG_PARTITION_GRACE', 60))
+    
+    # 日志保留天数，超过的归档分区整体删除（0表示不自动删除）
+    LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS', 0))
+    
+    # 日志参数/结果的最大字节数，超过时截断（0表示不限制）
+    LOG_PAYLOAD_MAX_BYTES = int(os.environ.get('LOG_PAYLOAD_MAX_BYTES', 65536))
+    
+    # 日志参数/结果的压缩方式：none、zlib 或 zstd
+    LOG_PAYLOAD_COMPRESSION = os.environ.get('LOG_PAYLOAD_COMPRESSION', 'zlib')
+    
+    # 日志参数/结果达到该字节数才压缩
+    LOG_PAYLOAD_COMPRESS_MIN_BYTES = int(os.environ.get('LOG_PAYLOAD_COMPRESS_MIN_BYTES', 1024))
+    
+    # 批量上报日志每次最多的条数
+    LOG_BULK_MAX_RECORDS = int(os.environ.get('LOG_BULK_MAX_RECORDS', 10000))
+    
+    # 批量上报日志的created_at最多允许晚于服务器时间的秒数（客户端时钟偏差），更晚的记录被拒绝
+    LOG_BULK_MAX_CLOCK_SKEW = float(os.environ.get('LOG_BULK_MAX_CLOCK_SKEW', 300))
+    
+    # 日志采样：默认参与采样的级别（逗号分隔，error级别总是保留）
+    LOG_SAMPLED_LEVELS = [level.strip() for level in os.environ.get('LOG_SAMPLED_LEVELS', 'info,debug').split(',') if level.strip()]
+    
+    # 日志采样：保留比例（1表示全部保留，可在工具配置log_sampling中按级别覆盖）
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+    
+    # 日志采样：每个工具每个级别每秒最多写入的条数（0表示不限制）
+    LOG_RATE_LIMIT = float(os.environ.get('LOG_RATE_LIMIT', 0))
+    
+    # 日志采样：令牌桶容量，允许的瞬时突发条数
+    LOG_RATE_BURST = float(os.environ.get('LOG_RATE_BURST', 100))
+    
+    # 日志采样：丢弃计数写入汇总表的间隔秒数
+    LOG_SAMPLING_FLUSH_INTERVAL = float(os.environ.get('LOG_SAMPLING_FLUSH_INTERVAL', 60))
+    
+    # 实时日志：保留用于断线补发的最近事件数
+    LOG_STREAM_BUFFER = int(os.environ.get('LOG_STREAM_BUFFER', 1000))
+    
+    # 实时日志：每个客户端的待发送队列长度（读取过慢时丢弃新事件）
+    LOG_STREAM_QUEUE_SIZE = int(os.environ.get('LOG_STREAM_QUEUE_SIZE', 1000))
+    
+    # 实时日志：心跳间隔秒数
+    LOG_STREAM_HEARTBEAT = float(os.environ.get('LOG_STREAM_HEARTBEAT', 15))
+    
+    # 实时日志：最大同时连接数
+    LOG_STREAM_MAX_CLIENTS = int(os.environ.get('LOG_STREAM_MAX_CLIENTS', 100))
+    
+    # 熔断器：触发熔断的错误率（可在工具配置circuit_breaker中覆盖）
+    CIRCUIT_ERROR_RATE = float(os.environ.get('CIRCUIT_ERROR_RATE', 0.5))
+    # 熔断器：超过该毫秒数的调用计为慢调用
+    CIRCUIT_SLOW_CALL_MS = float(os.environ.get('CIRCUIT_SLOW_CALL_MS', 30000))
+    # 熔断器：触发熔断的慢调用比例
+    CIRCUIT_SLOW_CALL_RATE = float(os.environ.get('CIRCUIT_SLOW_CALL_RATE', 0.8))
+    # 熔断器：统计窗口内至少有多少次调用才判断是否熔断
+    CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS', 10))
+    # 熔断器：统计最近多少次调用
+    CIRCUIT_WINDOW = int(os.environ.get('CIRCUIT_WINDOW', 50))
+    # 熔断器：打开后多少秒进入半开状态
+    CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 30))
+    # 熔断器：半开状态放行的探测调用数
+    CIRCUIT_HALF_OPEN_CALLS = int(os.environ.get('CIRCUIT_HALF_OPEN_CALLS', 3))
+    
+    # 异步调用任务线程池大小
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 8))
+    # 异步调用任务最大排队数
+    JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 100))
+    # 已完成任务结果保留秒数
+    JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 3600))
+    
+    # 批量调用的最大条目数
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 1000))
+    # 批量调用的最大并发数
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 16))
+    
+    # 结果缓存默认过期秒数
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 300))
+    # 结果缓存最大条目数
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 10000))
+    # 结果缓存最大字节数
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    
+    # 单个工具默认最大并发调用数（可在工具配置max_concurrency中覆盖）
+    TOOL_MAX_CONCURRENCY = int(os.environ.get('TOOL_MAX_CONCURRENCY', 8))
+    # 单个工具默认最大排队数（可在工具配置max_queue中覆盖）
+    TOOL_MAX_QUEUE = int(os.environ.get('TOOL_MAX_QUEUE', 32))
+    # 单个工具默认最长排队秒数（可在工具配置queue_timeout中覆盖）
+    TOOL_QUEUE_TIMEOUT = float(os.environ.get('TOOL_QUEUE_TIMEOUT', 30))
+    # 工具繁忙被拒绝时建议重试等待的最长秒数（Retry-After按平均调用时长和排队数估算）
+    TOOL_RETRY_AFTER_MAX = int(os.environ.get('TOOL_RETRY_AFTER_MAX', 60))
+    
+    # 流式调用的进度事件缓冲条数
+    STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 256))
+    # 流式调用的单个内容事件最大字符数
+    STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 64 * 1024))
+    # 流式响应的心跳间隔秒数
+    STREAM_HEARTBEAT_INTERVAL = float(os.environ.get('STREAM_HEARTBEAT_INTERVAL', 15))
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
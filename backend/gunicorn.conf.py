@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+
+# 监听地址
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5005')
+
+# 使用线程worker：实时日志（/api/logs/stream）、流式调用（/invoke/stream）和日志导出是长连接，
+# 默认的同步worker一次只能处理一个请求，一个订阅者就会占满worker并被超时杀掉
+worker_class = 'gthread'
+
+# 工作进程数：必须为1。异步调用任务、日志清除任务、工具进程池、熔断器和实时日志都保存在进程内存中，
+# 多个工作进程时按job_id查询或取消任务的请求可能落到其他进程而返回404；需要更高并发时增加threads
+workers = 1
+
+# 每个工作进程的线程数，应大于LOG_STREAM_MAX_CLIENTS加上常规请求所需的并发数
+threads = int(os.environ.get('GUNICORN_THREADS', 128))
+
+# worker心跳超时秒数（线程worker下不限制单个请求的时长）
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def on_starting(server):
+    """启动前检查工作进程数（命令行的 -w/--workers 会覆盖本文件的设置）"""
+    if server.cfg.workers != 1:
+        raise RuntimeError(
+            f"MCP平台只支持单个gunicorn工作进程（当前为{server.cfg.workers}个）：任务和工具进程状态保存在进程内存中，"
+            "请改用 --threads 提高并发"
+        )
@@ -9,6 +9,7 @@ import importlib
 import argparse
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 
 # 将项目根目录添加到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -50,6 +51,7 @@ class MigrationManager:
         with open(filepath, 'w') as f:
             f.write("""#!/usr/bin/env python
 # -*- coding: utf-8 -*-
+from sqlalchemy import text
 
 def upgrade(db):
     \"\"\"
@@ -59,7 +61,9 @@ def upgrade(db):
         db: SQLAlchemy实例
     \"\"\"
     # 在此编写升级操作
-    # 例如: db.engine.execute("ALTER TABLE users ADD COLUMN email VARCHAR(100)")
+    # 例如:
+    # with db.engine.begin() as conn:
+    #     conn.execute(text("ALTER TABLE users ADD COLUMN email VARCHAR(100)"))
     pass
 
 def downgrade(db):
@@ -70,7 +74,9 @@ def downgrade(db):
         db: SQLAlchemy实例
     \"\"\"
     # 在此编写回滚操作
-    # 例如: db.engine.execute("ALTER TABLE users DROP COLUMN email")
+    # 例如:
+    # with db.engine.begin() as conn:
+    #     conn.execute(text("ALTER TABLE users DROP COLUMN email"))
     pass
 """)
         
@@ -93,18 +99,19 @@ def downgrade(db):
         
         # 创建迁移表（如果不存在）
         with self.app.app_context():
-            self.db.engine.execute("""
-            CREATE TABLE IF NOT EXISTS migrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                version VARCHAR(100) NOT NULL,
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # 获取已应用的迁移
-            applied_migrations = []
-            for row in self.db.engine.execute("SELECT version FROM migrations"):
-                applied_migrations.append(row[0])
+            with self.db.engine.begin() as conn:
+                conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS migrations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    version VARCHAR(100) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """))
+                
+                # 获取已应用的迁移
+                applied_migrations = []
+                for row in conn.execute(text("SELECT version FROM migrations")):
+                    applied_migrations.append(row[0])
             
             if direction == "up":
                 # 应用未应用的迁移
@@ -135,13 +142,25 @@ def downgrade(db):
             # 执行升级
             with self.app.app_context():
                 print(f"应用迁移: {version}")
+                
+                # 迁移声明了QUERY_PLANS时，打印升级前后的执行计划以便对比
+                query_plans = getattr(migration, 'QUERY_PLANS', None)
+                if query_plans:
+                    print("升级前执行计划:")
+                    self.explain_queries(query_plans)
+                
                 migration.upgrade(self.db)
                 
+                if query_plans:
+                    print("升级后执行计划:")
+                    self.explain_queries(query_plans)
+                
                 # 记录已应用的迁移
-                self.db.engine.execute(
-                    "INSERT INTO migrations (version) VALUES (?)",
-                    (version,)
-                )
+                with self.db.engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO migrations (version) VALUES (:version)"),
+                        {'version': version}
+                    )
                 print(f"迁移应用成功: {version}")
         except Exception as e:
             print(f"迁移应用失败: {version}")
@@ -167,16 +186,67 @@ def downgrade(db):
                 migration.downgrade(self.db)
                 
                 # 删除迁移记录
-                self.db.engine.execute(
-                    "DELETE FROM migrations WHERE version = ?",
-                    (version,)
-                )
+                with self.db.engine.begin() as conn:
+                    conn.execute(
+                        text("DELETE FROM migrations WHERE version = :version"),
+                        {'version': version}
+                    )
                 print(f"迁移回滚成功: {version}")
         except Exception as e:
             print(f"迁移回滚失败: {version}")
             print(f"错误: {str(e)}")
             raise
 
+    def explain_queries(self, queries):
+        """
+        打印查询的执行计划，标出仍需全表扫描的查询
+        
+        Args:
+            queries: (说明, SQL) 列表
+            
+        Returns:
+            仍需全表扫描的查询说明列表
+        """
+        full_scans = []
+        dialect = self.db.engine.dialect.name
+        
+        # 丢弃连接池中的旧连接，避免复用结构变更前缓存的语句
+        self.db.engine.dispose()
+        with self.db.engine.connect() as conn:
+            for description, sql in queries:
+                if dialect == 'sqlite':
+                    # 行格式: (id, parent, notused, detail)，如 "SCAN logs" 或 "SEARCH logs USING INDEX ..."
+                    steps = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+                    full_scan = any(step.startswith('SCAN') and 'INDEX' not in step for step in steps)
+                else:
+                    # MySQL: type为ALL表示全表扫描
+                    rows = [dict(row._mapping) for row in conn.execute(text(f"EXPLAIN {sql}"))]
+                    steps = [
+                        f"table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+                        f"rows={row.get('rows')} extra={row.get('Extra')}"
+                        for row in rows
+                    ]
+                    full_scan = any(row.get('type') == 'ALL' for row in rows)
+                
+                if full_scan:
+                    full_scans.append(description)
+                print(f"  [{'全表扫描' if full_scan else '使用索引'}] {description}: {sql}")
+                for step in steps:
+                    print(f"      {step}")
+        
+        return full_scans
+    
+    def explain_migrations(self):
+        """打印所有迁移声明的QUERY_PLANS在当前数据库上的执行计划"""
+        for filename in sorted(os.listdir(self.migrations_dir)):
+            if filename.endswith('.py') and not filename.startswith('__'):
+                migration = importlib.import_module(f"backend.migrations.versions.{filename[:-3]}")
+                query_plans = getattr(migration, 'QUERY_PLANS', None)
+                if query_plans:
+                    print(f"{filename[:-3]}:")
+                    with self.app.app_context():
+                        self.explain_queries(query_plans)
+
 def create_app():
     """创建Flask应用实例"""
     app = Flask(__name__)
@@ -199,6 +269,9 @@ if __name__ == "__main__":
     # 回滚命令
     subparsers.add_parser("downgrade", help="回滚所有迁移")
     
+    # 执行计划检查命令
+    subparsers.add_parser("explain", help="打印迁移中声明的查询的执行计划")
+    
     args = parser.parse_args()
     
     # 创建应用
@@ -214,5 +287,7 @@ if __name__ == "__main__":
         manager.run_migrations("up")
     elif args.command == "downgrade":
         manager.run_migrations("down")
+    elif args.command == "explain":
+        manager.explain_migrations()
     else:
         parser.print_help()
\ No newline at end of file
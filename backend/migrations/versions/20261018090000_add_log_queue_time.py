@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from sqlalchemy import inspect, text
+
+def upgrade(db):
+    """
+    升级数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    # 日志表增加排队等待时长列（db.create_all()新建的表已包含该列）
+    columns = [column['name'] for column in inspect(db.engine).get_columns('logs')]
+    if 'queue_time' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE logs ADD COLUMN queue_time INTEGER"))
+
+def downgrade(db):
+    """
+    回滚数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    columns = [column['name'] for column in inspect(db.engine).get_columns('logs')]
+    if 'queue_time' in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE logs DROP COLUMN queue_time"))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from sqlalchemy import inspect, text
+
+# 新增的索引：(表名, 索引名, 列)
+INDEXES = [
+    ('logs', 'ix_logs_created_at', ['created_at']),
+    ('logs', 'ix_logs_tool_id_created_at', ['tool_id', 'created_at']),
+    ('logs', 'ix_logs_level_created_at', ['level', 'created_at']),
+    ('tools', 'ix_tools_invoke_count', ['invoke_count']),
+]
+
+# 迁移前后对比执行计划的查询（对应日志列表、工具日志、仪表盘统计和最近活动）
+QUERY_PLANS = [
+    ('日志列表', "SELECT * FROM logs ORDER BY created_at DESC LIMIT 20"),
+    ('按级别过滤日志', "SELECT * FROM logs WHERE level = 'error' ORDER BY created_at DESC LIMIT 20"),
+    ('工具日志', "SELECT * FROM logs WHERE tool_id = 1 ORDER BY created_at DESC LIMIT 20"),
+    ('每日调用数', "SELECT COUNT(*) FROM logs WHERE created_at >= '2026-01-01 00:00:00' AND created_at <= '2026-01-01 23:59:59'"),
+    ('每日错误数', "SELECT COUNT(*) FROM logs WHERE level = 'error' AND created_at >= '2026-01-01 00:00:00' AND created_at <= '2026-01-01 23:59:59'"),
+    ('最活跃工具', "SELECT * FROM tools ORDER BY invoke_count DESC LIMIT 5"),
+]
+
+def upgrade(db):
+    """
+    升级数据库结构
+
+    Args:
+        db: SQLAlchemy实例
+    """
+    # 为日志和工具表的常用过滤、排序条件建立索引（db.create_all()新建的表已包含这些索引）
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, name, columns in INDEXES:
+            existing = [index['name'] for index in inspector.get_indexes(table)]
+            if name not in existing:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+def downgrade(db):
+    """
+    回滚数据库结构
+
+    Args:
+        db: SQLAlchemy实例
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, name, _ in reversed(INDEXES):
+            existing = [index['name'] for index in inspector.get_indexes(table)]
+            if name in existing:
+                if db.engine.dialect.name == 'mysql':
+                    conn.execute(text(f"DROP INDEX {name} ON {table}"))
+                else:
+                    conn.execute(text(f"DROP INDEX {name}"))
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from backend.services.log_search import log_search
+
+def upgrade(db):
+    """
+    升级数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    # 建立日志消息的全文索引：SQLite为FTS5表及同步触发器，MySQL为FULLTEXT索引
+    backend = log_search.setup(db.engine)
+    print(f"日志检索方式: {backend}")
+
+def downgrade(db):
+    """
+    回滚数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    log_search.teardown(db.engine)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from sqlalchemy import inspect
+from backend.models.log import LogSummary
+
+def upgrade(db):
+    """
+    升级数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    # 新建日志采样汇总表（db.create_all()会自动创建）
+    if not inspect(db.engine).has_table(LogSummary.__tablename__):
+        LogSummary.__table__.create(db.engine)
+
+def downgrade(db):
+    """
+    回滚数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    if inspect(db.engine).has_table(LogSummary.__tablename__):
+        LogSummary.__table__.drop(db.engine)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from sqlalchemy import inspect, text
+from backend.models.log import LogPartition
+
+def log_tables(db):
+    """日志表和已存在的归档分区表（归档表的列需与日志表一致）"""
+    inspector = inspect(db.engine)
+    tables = ['logs']
+    if inspector.has_table(LogPartition.__tablename__):
+        with db.engine.connect() as conn:
+            names = conn.execute(text(f"SELECT name FROM {LogPartition.__tablename__}")).scalars().all()
+        tables.extend(name for name in names if inspector.has_table(name))
+    return inspector, tables
+
+def upgrade(db):
+    """
+    升级数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    # 日志表和归档分区表增加结果缓存状态列（db.create_all()新建的表已包含该列）
+    inspector, tables = log_tables(db)
+    with db.engine.begin() as conn:
+        for table in tables:
+            columns = [column['name'] for column in inspector.get_columns(table)]
+            if 'cache_status' not in columns:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN cache_status VARCHAR(10)"))
+
+def downgrade(db):
+    """
+    回滚数据库结构
+    
+    Args:
+        db: SQLAlchemy实例
+    """
+    inspector, tables = log_tables(db)
+    with db.engine.begin() as conn:
+        for table in tables:
+            columns = [column['name'] for column in inspector.get_columns(table)]
+            if 'cache_status' in columns:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN cache_status"))
@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from .db import db, BaseModel
+from .db import db, BaseModel, parse_fields, load_fields
 from .tool import Tool, TOOL_TYPES, TOOL_STATUS
-from .log import Log, LOG_LEVELS
+from .log import Log, LogPartition, LogSummary, LOG_LEVELS
 from .config import Config, CONFIG_TYPES
 from .template import Template
 from backend.models.user import User
@@ -11,6 +11,8 @@ from backend.models.user import User
 models = [
     Tool,
     Log,
+    LogPartition,
+    LogSummary,
     Config,
     Template,
     User
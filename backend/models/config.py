@@ -67,9 +67,10 @@ class Config(db.Model, BaseModel):
         else:
             self.content = content
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """转换为字典（包括解析的内容）"""
-        config_dict = super().to_dict()
+        config_dict = super().to_dict(fields)
         # 将内容JSON字符串转换为Python字典
-        config_dict['content'] = self.get_content()
+        if 'content' in config_dict:
+            config_dict['content'] = self.get_content()
         return config_dict 
\ No newline at end of file
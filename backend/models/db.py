@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import load_only
 from datetime import datetime
 
 # 初始化SQLAlchemy
@@ -14,9 +15,14 @@ class BaseModel:
     # 更新时间
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        """将模型转换为字典"""
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+    def to_dict(self, fields=None):
+        """
+        将模型转换为字典
+        
+        Args:
+            fields: 只包含这些字段，为None时包含全部字段
+        """
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if fields is None or c.name in fields}
     
     def save(self):
         """保存模型到数据库"""
@@ -28,4 +34,39 @@ class BaseModel:
         """从数据库删除模型"""
         db.session.delete(self)
         db.session.commit()
-        return self 
\ No newline at end of file
+        return self
+
+def parse_fields(model, value):
+    """
+    解析列表接口的 fields 参数（逗号分隔的字段名）
+    
+    Args:
+        model: 模型类
+        value: fields参数值
+        
+    Returns:
+        字段名列表（总是包含id），value为空时返回None表示全部字段；包含未知字段时抛出ValueError
+    """
+    if not value:
+        return None
+    columns = [column.name for column in model.__table__.columns]
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}")
+    return list(dict.fromkeys(['id'] + fields))
+
+def load_fields(model, fields, *required):
+    """
+    只加载指定字段的查询选项，其余列（包括大文本列）延迟加载且不会被解析
+    
+    Args:
+        model: 模型类
+        fields: 字段名列表
+        required: 排序、分页等需要但不一定返回的字段
+        
+    Returns:
+        查询选项
+    """
+    names = dict.fromkeys(list(fields) + list(required))
+    return load_only(*[getattr(model, name) for name in names])
@@ -1,7 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from backend.models.db import db, BaseModel
+from backend.config import Config
+import base64
 import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # 日志级别枚举
 LOG_LEVELS = [
@@ -11,9 +19,146 @@ LOG_LEVELS = [
     'debug'      # 调试
 ]
 
-class Log(db.Model, BaseModel):
+# 结果缓存状态（开启结果缓存的工具调用成功时记录）
+CACHE_STATUSES = [
+    'hit',       # 命中缓存，未访问工具进程
+    'miss'       # 未命中，调用了工具并写入缓存
+]
+
+# 调用参数/结果的压缩方式
+PAYLOAD_COMPRESSIONS = [
+    'none',      # 不压缩
+    'zlib',      # zlib（标准库）
+    'zstd'       # zstd（需安装zstandard，未安装时使用zlib并在启动时告警）
+]
+
+# 压缩后的存储文本前缀（JSON文本不会以~开头）
+ZLIB_PREFIX = '~zlib:'
+ZSTD_PREFIX = '~zstd:'
+
+def encode_payload(value):
+    """
+    把调用参数/结果编码为存储文本
+    
+    非字符串先转为JSON；超过LOG_PAYLOAD_MAX_BYTES时截断为带预览的JSON对象；
+    不小于LOG_PAYLOAD_COMPRESS_MIN_BYTES时压缩并以base64存储（压缩后更大时保留原文）。
+    
+    Args:
+        value: 参数或结果（对象或JSON字符串）
+        
+    Returns:
+        存储文本，value为None时返回None
+    """
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    raw = text.encode('utf-8')
+    
+    # 超长截断，保留开头部分作为预览
+    if Config.LOG_PAYLOAD_MAX_BYTES > 0 and len(raw) > Config.LOG_PAYLOAD_MAX_BYTES:
+        text = json.dumps({
+            '_truncated': True,
+            'size': len(raw),
+            'preview': raw[:Config.LOG_PAYLOAD_MAX_BYTES].decode('utf-8', 'ignore')
+        }, ensure_ascii=False)
+        raw = text.encode('utf-8')
+    
+    if Config.LOG_PAYLOAD_COMPRESSION == 'none' or len(raw) < Config.LOG_PAYLOAD_COMPRESS_MIN_BYTES:
+        return text
+    
+    if Config.LOG_PAYLOAD_COMPRESSION == 'zstd' and zstandard is not None:
+        encoded = ZSTD_PREFIX + base64.b64encode(zstandard.ZstdCompressor().compress(raw)).decode('ascii')
+    else:
+        encoded = ZLIB_PREFIX + base64.b64encode(zlib.compress(raw)).decode('ascii')
+    return encoded if len(encoded) < len(text) else text
+
+def decode_payload_text(text):
+    """
+    把存储文本还原为JSON文本（不解析）
+    
+    Args:
+        text: 存储文本
+        
+    Returns:
+        JSON文本，无法解压时返回None
+    """
+    if not text:
+        return text
+    try:
+        if text.startswith(ZLIB_PREFIX):
+            return zlib.decompress(base64.b64decode(text[len(ZLIB_PREFIX):])).decode('utf-8')
+        if text.startswith(ZSTD_PREFIX):
+            return zstandard.ZstdDecompressor().decompress(base64.b64decode(text[len(ZSTD_PREFIX):])).decode('utf-8')
+    except Exception:
+        return None
+    return text
+
+def decode_payload(text):
+    """
+    把存储文本解码为对象
+    
+    Args:
+        text: 存储文本
+        
+    Returns:
+        解析后的对象，为空或无法解析时返回{}
+    """
+    text = decode_payload_text(text)
+    if not text:
+        return {}
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {}
+
+class LogMixin:
+    """日志的公共方法，日志表和归档分区表（见services/log_partitions.py）的映射类共用"""
+    
+    def _payload(self, name):
+        """按需解码参数或结果，解码结果缓存在实例上"""
+        raw = getattr(self, name)
+        cache = self.__dict__.setdefault('_payload_cache', {})
+        cached = cache.get(name)
+        if cached is None or cached[0] is not raw:
+            cached = cache[name] = (raw, decode_payload(raw))
+        return cached[1]
+    
+    def get_params(self):
+        """获取调用参数（解压并解析JSON）"""
+        return self._payload('params')
+    
+    def get_result(self):
+        """获取调用结果（解压并解析JSON）"""
+        return self._payload('result')
+    
+    def to_dict(self, fields=None):
+        """
+        转换为字典（包括解析的参数和结果）
+        
+        Args:
+            fields: 只包含这些字段，为None时包含全部字段；未包含的参数和结果不会解码
+        """
+        log_dict = {c.name: getattr(self, c.name) for c in self.__table__.columns if fields is None or c.name in fields}
+        # 将JSON字符串转换为Python字典
+        if 'params' in log_dict:
+            log_dict['params'] = self.get_params()
+        if 'result' in log_dict:
+            log_dict['result'] = self.get_result()
+        return log_dict
+
+class Log(LogMixin, db.Model, BaseModel):
     """MCP工具日志模型"""
     __tablename__ = 'logs'
+    __table_args__ = (
+        # 按时间倒序列表、仪表盘按日统计
+        db.Index('ix_logs_created_at', 'created_at'),
+        # 按工具查看日志
+        db.Index('ix_logs_tool_id_created_at', 'tool_id', 'created_at'),
+        # 按级别过滤、按日统计错误数
+        db.Index('ix_logs_level_created_at', 'level', 'created_at'),
+        # 日志表轮转为归档分区后，新表的ID接续旧表递增
+        {'sqlite_autoincrement': True},
+    )
     
     # 日志ID
     id = db.Column(db.Integer, primary_key=True)
@@ -23,16 +168,21 @@ class Log(db.Model, BaseModel):
     level = db.Column(db.String(20), nullable=False, default='info')
     # 日志消息
     message = db.Column(db.Text, nullable=False)
-    # 调用参数（JSON格式）
+    # 调用参数（JSON格式，较大时压缩存储，见encode_payload）
     params = db.Column(db.Text, nullable=True)
-    # 调用结果（JSON格式）
+    # 调用结果（JSON格式，较大时压缩存储，见encode_payload）
     result = db.Column(db.Text, nullable=True)
-    # 执行时长（毫秒）
+    # 执行时长（毫秒），不含排队等待时间
     duration = db.Column(db.Integer, nullable=True)
+    # 排队等待时长（毫秒）
+    queue_time = db.Column(db.Integer, nullable=True)
     # 调用者信息
     caller = db.Column(db.String(100), nullable=True)
+    # 结果缓存状态（hit或miss），未开启缓存的调用为空
+    cache_status = db.Column(db.String(10), nullable=True)
     
-    def __init__(self, message, tool_id=None, level='info', params=None, result=None, duration=None, caller=None):
+    def __init__(self, message, tool_id=None, level='info', params=None, result=None, duration=None, caller=None, queue_time=None,
+                 cache_status=None):
         """
         初始化日志实例
         
@@ -44,47 +194,94 @@ class Log(db.Model, BaseModel):
             result: 调用结果
             duration: 执行时长
             caller: 调用者信息
+            queue_time: 排队等待时长
+            cache_status: 结果缓存状态
         """
         self.message = message
         self.tool_id = tool_id
         self.level = level if level in LOG_LEVELS else 'info'
         
-        # 参数和结果转JSON
-        if isinstance(params, dict):
-            self.params = json.dumps(params)
-        else:
-            self.params = params
-            
-        if isinstance(result, dict):
-            self.result = json.dumps(result)
-        else:
-            self.result = result
-            
+        # 参数和结果转JSON，超长截断、较大时压缩
+        self.params = encode_payload(params)
+        self.result = encode_payload(result)
+        
         self.duration = duration
+        self.queue_time = queue_time
         self.caller = caller
+        self.cache_status = cache_status if cache_status in CACHE_STATUSES else None
+
+class LogPartition(db.Model, BaseModel):
+    """日志归档分区目录，每行对应一张由日志表轮转得到的归档表"""
+    __tablename__ = 'log_partitions'
     
-    def get_params(self):
-        """获取调用参数（解析JSON）"""
-        if self.params:
-            try:
-                return json.loads(self.params)
-            except:
-                return {}
-        return {}
+    # 分区ID
+    id = db.Column(db.Integer, primary_key=True)
+    # 归档表名
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    # 最早日志时间
+    start_at = db.Column(db.DateTime, nullable=True)
+    # 最晚日志时间
+    end_at = db.Column(db.DateTime, nullable=True)
+    # 最小日志ID
+    min_id = db.Column(db.Integer, nullable=True)
+    # 最大日志ID
+    max_id = db.Column(db.Integer, nullable=True)
+    # 日志条数（归档时统计，之后从归档表中删除日志时扣减）
+    row_count = db.Column(db.Integer, default=0)
     
-    def get_result(self):
-        """获取调用结果（解析JSON）"""
-        if self.result:
-            try:
-                return json.loads(self.result)
-            except:
-                return {}
-        return {}
+    def __init__(self, name, start_at=None, end_at=None, min_id=None, max_id=None, row_count=0):
+        """
+        初始化分区目录项
+        
+        Args:
+            name: 归档表名
+            start_at: 最早日志时间
+            end_at: 最晚日志时间
+            min_id: 最小日志ID
+            max_id: 最大日志ID
+            row_count: 日志条数
+        """
+        self.name = name
+        self.start_at = start_at
+        self.end_at = end_at
+        self.min_id = min_id
+        self.max_id = max_id
+        self.row_count = row_count
+
+class LogSummary(db.Model, BaseModel):
+    """采样丢弃的日志计数，按工具、级别和时间窗口汇总（见services/log_sampler.py）"""
+    __tablename__ = 'log_summaries'
+    __table_args__ = (
+        # 按日统计、按保留期限清理
+        db.Index('ix_log_summaries_window_start', 'window_start'),
+    )
     
-    def to_dict(self):
-        """转换为字典（包括解析的参数和结果）"""
-        log_dict = super().to_dict()
-        # 将JSON字符串转换为Python字典
-        log_dict['params'] = self.get_params()
-        log_dict['result'] = self.get_result()
-        return log_dict 
\ No newline at end of file
+    # 汇总ID
+    id = db.Column(db.Integer, primary_key=True)
+    # 工具ID（不设外键，删除工具后汇总仍计入历史调用量）
+    tool_id = db.Column(db.Integer, nullable=True)
+    # 日志级别
+    level = db.Column(db.String(20), nullable=False)
+    # 窗口内第一条被丢弃日志的时间
+    window_start = db.Column(db.DateTime, nullable=False)
+    # 窗口内最后一条被丢弃日志的时间
+    window_end = db.Column(db.DateTime, nullable=False)
+    # 被丢弃的日志条数
+    sampled_out = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __init__(self, level, window_start, window_end, sampled_out, tool_id=None):
+        """
+        初始化采样汇总
+        
+        Args:
+            level: 日志级别
+            window_start: 窗口开始时间
+            window_end: 窗口结束时间
+            sampled_out: 被丢弃的日志条数
+            tool_id: 工具ID
+        """
+        self.tool_id = tool_id
+        self.level = level
+        self.window_start = window_start
+        self.window_end = window_end
+        self.sampled_out = sampled_out
@@ -52,9 +52,10 @@ class Template(db.Model, BaseModel):
                 return {}
         return {}
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """转换为字典（包括解析的内容）"""
-        template_dict = super().to_dict()
+        template_dict = super().to_dict(fields)
         # 将内容JSON字符串转换为Python字典
-        template_dict['content'] = self.get_content()
+        if 'content' in template_dict:
+            template_dict['content'] = self.get_content()
         return template_dict 
\ No newline at end of file
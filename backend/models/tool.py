@@ -24,6 +24,10 @@ TOOL_STATUS = [
 class Tool(db.Model, BaseModel):
     """MCP工具模型"""
     __tablename__ = 'tools'
+    __table_args__ = (
+        # 仪表盘按调用次数排序
+        db.Index('ix_tools_invoke_count', 'invoke_count'),
+    )
     
     # 工具ID
     id = db.Column(db.Integer, primary_key=True)
@@ -85,9 +89,10 @@ class Tool(db.Model, BaseModel):
         else:
             self.config = config
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """转换为字典（包括解析的配置）"""
-        tool_dict = super().to_dict()
+        tool_dict = super().to_dict(fields)
         # 将配置JSON字符串转换为Python字典
-        tool_dict['config'] = self.get_config()
+        if 'config' in tool_dict:
+            tool_dict['config'] = self.get_config()
         return tool_dict 
\ No newline at end of file
@@ -2,14 +2,18 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify
 from backend.models.config import Config, CONFIG_TYPES
-from backend.models.db import db
+from backend.models.db import db, parse_fields, load_fields
 
 # 创建配置蓝图
 config_bp = Blueprint('config', __name__)
 
 @config_bp.route('/', methods=['GET'])
 def get_configs():
-    """获取配置列表，支持过滤和分页"""
+    """
+    获取配置列表，支持过滤和分页
+    
+    fields 为逗号分隔的字段名时只返回这些字段（id总是返回），未请求的大文本列不会加载和解析。
+    """
     # 获取查询参数
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
@@ -17,8 +21,15 @@ def get_configs():
     is_active = request.args.get('is_active')
     search = request.args.get('search')
     
+    try:
+        fields = parse_fields(Config, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     # 构建查询
     query = Config.query
+    if fields:
+        query = query.options(load_fields(Config, fields))
     
     # 按类型过滤
     if config_type and config_type in CONFIG_TYPES:
@@ -41,7 +52,7 @@ def get_configs():
     pagination = query.order_by(Config.created_at.desc()).paginate(page=page, per_page=per_page)
     
     # 准备响应数据
-    configs = [config.to_dict() for config in pagination.items]
+    configs = [config.to_dict(fields) for config in pagination.items]
     
     return jsonify({
         'configs': configs,
@@ -5,6 +5,11 @@ from backend.models.tool import Tool
 from backend.models.log import Log
 from backend.models.config import Config
 from backend.models.db import db
+from backend.services.circuit_breaker import circuit_breakers
+from backend.services.log_writer import log_writer
+from backend.services.log_feed import log_feed
+from backend.services.log_partitions import log_partitions
+from backend.services.log_sampler import log_sampler
 from datetime import datetime, timedelta
 import psutil
 
@@ -20,14 +25,21 @@ def get_overview():
     inactive_tools = Tool.query.filter_by(status='inactive').count()
     error_tools = Tool.query.filter_by(status='error').count()
     
-    # 获取日志统计信息
-    total_logs = Log.query.count()
-    info_logs = Log.query.filter_by(level='info').count()
-    warning_logs = Log.query.filter_by(level='warning').count()
-    error_logs = Log.query.filter_by(level='error').count()
+    # 获取日志统计信息（汇总所有分区）
+    models = log_partitions.models()
+    total_logs = sum(db.session.query(model).count() for model in models)
+    info_logs = sum(db.session.query(model).filter_by(level='info').count() for model in models)
+    warning_logs = sum(db.session.query(model).filter_by(level='warning').count() for model in models)
+    error_logs = sum(db.session.query(model).filter_by(level='error').count() for model in models)
+    
+    # 加回被采样丢弃的日志条数，调用量保持准确
+    sampled_out = log_sampler.sampled_out()
+    total_logs += sampled_out
+    info_logs += log_sampler.sampled_out(level='info')
+    warning_logs += log_sampler.sampled_out(level='warning')
     
     # 获取最近的日志
-    recent_logs = Log.query.order_by(Log.created_at.desc()).limit(5).all()
+    recent_logs = log_partitions.newest(lambda model: db.session.query(model), 5, models)
     recent_logs_data = [log.to_dict() for log in recent_logs]
     
     # 获取最活跃的工具（按调用次数）
@@ -59,9 +71,13 @@ def get_overview():
             'info': info_logs,
             'warning': warning_logs,
             'error': error_logs,
+            'sampled_out': sampled_out,
             'recent': recent_logs_data
         },
         'active_tools': active_tools_list,
+        'circuit_breakers': circuit_breakers.summary(),
+        'log_writer': log_writer.stats(),
+        'log_stream': log_feed.stats(),
         'system': {
             'cpu_usage': cpu_usage,
             'memory_usage': memory_usage,
@@ -85,24 +101,32 @@ def get_daily_stats():
         start_date = datetime.combine(date, datetime.min.time())
         end_date = datetime.combine(date, datetime.max.time())
         
-        # 获取当天的调用次数
-        calls_count = Log.query.filter(
-            Log.created_at >= start_date,
-            Log.created_at <= end_date
-        ).count()
+        # 只统计与当天重叠的分区
+        calls_count = 0
+        error_count = 0
+        for model in log_partitions.models(start_date, end_date):
+            # 获取当天的调用次数
+            calls_count += db.session.query(model).filter(
+                model.created_at >= start_date,
+                model.created_at <= end_date
+            ).count()
+            
+            # 获取当天的错误次数
+            error_count += db.session.query(model).filter(
+                model.created_at >= start_date,
+                model.created_at <= end_date,
+                model.level == 'error'
+            ).count()
         
-        # 获取当天的错误次数
-        error_count = Log.query.filter(
-            Log.created_at >= start_date,
-            Log.created_at <= end_date,
-            Log.level == 'error'
-        ).count()
+        # 加回当天被采样丢弃的日志条数（错误日志不会被丢弃）
+        sampled_out = log_sampler.sampled_out(start_date, end_date)
         
         # 添加到结果中
         daily_stats.append({
             'date': date.isoformat(),
-            'calls': calls_count,
-            'errors': error_count
+            'calls': calls_count + sampled_out,
+            'errors': error_count,
+            'sampled_out': sampled_out
         })
     
     return jsonify(daily_stats)
@@ -132,7 +156,7 @@ def get_tool_types():
 def get_recent_activities():
     """获取最近活动"""
     # 获取最近的日志
-    recent_logs = Log.query.order_by(Log.created_at.desc()).limit(10).all()
+    recent_logs = log_partitions.newest(lambda model: db.session.query(model), 10, log_partitions.models())
     
     # 转换为活动数据
     activities = []
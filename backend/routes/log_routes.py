@@ -1,74 +1,502 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from flask import Blueprint, request, jsonify
-from backend.models.log import Log, LOG_LEVELS
+from flask import Blueprint, request, jsonify, current_app, url_for, abort, Response, stream_with_context
+from sqlalchemy import and_, or_, func
+from backend.models.log import Log, LOG_LEVELS, CACHE_STATUSES, decode_payload_text
 from backend.models.tool import Tool
-from backend.models.db import db
-from datetime import datetime, timedelta
+from backend.models.db import db, parse_fields, load_fields
+from backend.services.log_search import log_search
+from backend.services.log_cleanup import log_cleanup
+from backend.services.log_partitions import log_partitions
+from backend.services.log_feed import log_feed
+from backend.services.log_writer import log_writer
+from backend.services.log_sampler import log_sampler
+from backend.config import Config
+from datetime import datetime, timedelta, timezone
+import base64
+import json
+import math
+import csv
+import io
+import zlib
+import queue
 
 # 创建日志蓝图
 log_bp = Blueprint('log', __name__)
 
+# 游标分页每页最大条数
+MAX_CURSOR_PAGE_SIZE = 1000
+
+# 日志导出格式
+EXPORT_FORMATS = [
+    'ndjson',        # 每行一个JSON对象
+    'csv'            # CSV，params和result为JSON字符串
+]
+
+# 导出时每批读取的日志条数
+EXPORT_BATCH_SIZE = 1000
+
+# 导出时攒够多少字节输出一次
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# 实时日志断线后客户端的重连间隔（毫秒）
+STREAM_RETRY_MS = 3000
+
+def encode_cursor(log):
+    """
+    根据一页中最后一条日志生成游标
+    
+    Args:
+        log: 日志实例
+        
+    Returns:
+        游标字符串
+    """
+    payload = json.dumps([log.created_at.isoformat(), log.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    解析游标
+    
+    Args:
+        cursor: 游标字符串
+        
+    Returns:
+        (创建时间, 日志ID) 元组，游标无效时抛出ValueError
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(log_id)
+    except Exception:
+        raise ValueError('无效的游标')
+
+def parse_datetime(value):
+    """
+    解析ISO格式的时间参数，带时区时转换为UTC（数据库中的时间均为UTC）
+    
+    Args:
+        value: 时间字符串
+        
+    Returns:
+        不带时区的datetime，格式无效时返回None
+    """
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def older_than(query, model, created_at, log_id):
+    """
+    只保留按 (created_at, id) 倒序排在指定位置之后的日志
+    
+    外层的 created_at <= X 让数据库可以把created_at索引当作范围扫描，直接从游标位置开始读取；
+    只写 created_at < X OR (created_at = X AND id < Y) 时SQLite无法使用范围，每页都从最新一行开始扫描。
+    
+    Args:
+        query: 日志查询
+        model: 日志映射类
+        created_at: 创建时间
+        log_id: 日志ID
+        
+    Returns:
+        加上条件的查询
+    """
+    return query.filter(and_(
+        model.created_at <= created_at,
+        or_(model.created_at < created_at, model.id < log_id)
+    ))
+
+def count_logs(build_query, models):
+    """统计各分区中符合条件的日志总数"""
+    return sum(build_query(model)[0].order_by(None).count() for model in models)
+
+def cursor_paginate(build_query, models, cursor, per_page, with_total=False, fields=None):
+    """
+    按 (created_at, id) 倒序进行游标分页
+    
+    每页只读取 per_page + 1 行，不使用OFFSET，翻页耗时与表大小无关；
+    跨分区时从最新的分区开始读取，取够一页即停止。总数只在 with_total 为True时统计。
+    
+    Args:
+        build_query: 接收日志映射类、返回 (已应用过滤条件的查询, 相关度) 的函数
+        models: 要查询的日志映射类列表
+        cursor: 上一页返回的next_cursor，为空时从最新的日志开始
+        per_page: 每页条数
+        with_total: 是否统计总数
+        fields: 只返回这些字段，为None时返回全部字段
+        
+    Returns:
+        响应数据字典
+    """
+    per_page = max(1, min(per_page, MAX_CURSOR_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    total = count_logs(build_query, models) if with_total else None
+    
+    def build_page(model):
+        query = build_query(model)[0]
+        if after:
+            query = older_than(query, model, *after)
+        return query
+    
+    items = log_partitions.newest(build_page, per_page + 1, models)
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    
+    return {
+        'logs': [log.to_dict(fields) for log in items],
+        'next_cursor': encode_cursor(items[-1]) if has_more else None,
+        'has_more': has_more,
+        'per_page': per_page,
+        'total': total
+    }
+
+def page_paginate(build_query, models, page, per_page, by_relevance=False):
+    """
+    按页码分页，默认按 (created_at, id) 倒序，by_relevance 为True时按相关度排序
+    
+    只有热分区时直接使用paginate；跨分区时每个分区取前 page * per_page 条归并后截取。
+    
+    Args:
+        build_query: 接收日志映射类、返回 (已应用过滤条件的查询, 相关度) 的函数
+        models: 要查询的日志映射类列表
+        page: 页码
+        per_page: 每页条数
+        by_relevance: 是否按相关度排序
+        
+    Returns:
+        (日志列表, 总数, 总页数) 元组
+    """
+    if len(models) == 1:
+        model = models[0]
+        query, relevance = build_query(model)
+        if by_relevance and relevance is not None:
+            query = query.order_by(relevance.desc(), model.created_at.desc(), model.id.desc())
+        else:
+            query = query.order_by(model.created_at.desc(), model.id.desc())
+        pagination = query.paginate(page=page, per_page=per_page)
+        return pagination.items, pagination.total, pagination.pages
+    
+    if page < 1 or per_page < 1:
+        abort(404)
+    limit = page * per_page
+    total = count_logs(build_query, models)
+    
+    if by_relevance and build_query(models[0])[1] is not None:
+        rows = []
+        for model in models:
+            query, relevance = build_query(model)
+            rows.extend(query.add_columns(relevance.label('relevance')).order_by(
+                relevance.desc(), model.created_at.desc(), model.id.desc()
+            ).limit(limit).all())
+        rows.sort(key=lambda row: (row[1], row[0].created_at, row[0].id), reverse=True)
+        items = [row[0] for row in rows[:limit]]
+    else:
+        items = log_partitions.newest(lambda model: build_query(model)[0], limit, models)
+    
+    items = items[limit - per_page:]
+    if page > 1 and not items:
+        abort(404)
+    return items, total, math.ceil(total / per_page)
+
+def is_cursor_mode():
+    """请求是否使用游标分页（带cursor参数，首页传空值即可）"""
+    return 'cursor' in request.args
+
+def wants_total():
+    """游标分页时是否统计总数"""
+    return request.args.get('with_total', 'false').lower() in ('true', '1')
+
+def log_query_builder(args, fields=None):
+    """
+    根据日志列表的过滤参数构建查询
+    
+    Args:
+        args: 请求参数（level、tool_id、cache_status、start_date、end_date、search）
+        fields: 只加载这些字段（另加分页需要的created_at），为None时加载全部字段
+        
+    Returns:
+        (build_query, models) 元组：build_query接收日志映射类，返回 (已应用过滤条件的查询, 相关度)；
+        models为与日期范围重叠的日志分区
+    """
+    level = args.get('level')
+    tool_id = args.get('tool_id', type=int)
+    cache_status = args.get('cache_status')
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    search = args.get('search')
+    
+    # 按日期范围过滤（同时决定要查询的分区）
+    start_datetime = parse_datetime(start_date) if start_date else None
+    end_datetime = parse_datetime(end_date) if end_date else None
+    
+    def build_query(model):
+        """为一个日志分区构建查询"""
+        query = db.session.query(model)
+        if fields:
+            query = query.options(load_fields(model, fields, 'created_at'))
+        
+        # 按级别过滤
+        if level and level in LOG_LEVELS:
+            query = query.filter(model.level == level)
+        
+        # 按工具ID过滤
+        if tool_id:
+            query = query.filter(model.tool_id == tool_id)
+        
+        # 按结果缓存状态过滤（hit、miss）
+        if cache_status and cache_status in CACHE_STATUSES:
+            query = query.filter(model.cache_status == cache_status)
+        
+        if start_datetime:
+            query = query.filter(model.created_at >= start_datetime)
+        if end_datetime:
+            query = query.filter(model.created_at <= end_datetime)
+        
+        # 按消息内容全文检索
+        if search:
+            return log_search.apply(query, search, model)
+        return query, None
+    
+    return build_query, log_partitions.models(start_datetime, end_datetime)
+
 @log_bp.route('/', methods=['GET'])
 def get_logs():
-    """获取日志列表，支持过滤和分页"""
+    """
+    获取日志列表，支持过滤和分页
+    
+    默认按page分页；带cursor参数时使用游标分页（首页传 cursor= ），
+    响应中的next_cursor用于获取下一页，with_total=true 时才统计总数。
+    search按空白拆分为多个关键词，全部匹配的日志才返回；
+    按page分页时 sort=relevance 按相关度排序。
+    fields 为逗号分隔的字段名时只返回这些字段（id总是返回），未请求的params和result不会加载和解码。
+    cache_status=hit 或 miss 时只返回命中或未命中结果缓存的调用日志（配合 with_total=true 统计命中数）。
+    """
     # 获取查询参数
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    level = request.args.get('level')
-    tool_id = request.args.get('tool_id', type=int)
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    search = request.args.get('search')
     
-    # 构建查询
-    query = Log.query
-    
-    # 按级别过滤
-    if level and level in LOG_LEVELS:
-        query = query.filter(Log.level == level)
-    
-    # 按工具ID过滤
-    if tool_id:
-        query = query.filter(Log.tool_id == tool_id)
+    try:
+        fields = parse_fields(Log, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # 按日期范围过滤
-    if start_date:
-        try:
-            start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            query = query.filter(Log.created_at >= start_datetime)
-        except ValueError:
-            pass
+    # 构建查询
+    build_query, models = log_query_builder(request.args, fields)
     
-    if end_date:
+    # 游标分页
+    if is_cursor_mode():
         try:
-            end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            query = query.filter(Log.created_at <= end_datetime)
-        except ValueError:
-            pass
-    
-    # 按消息内容搜索
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(Log.message.like(search_term))
+            return jsonify(cursor_paginate(build_query, models, request.args.get('cursor'), per_page, wants_total(), fields))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     # 分页
-    pagination = query.order_by(Log.created_at.desc()).paginate(page=page, per_page=per_page)
+    items, total, pages = page_paginate(
+        build_query, models, page, per_page, by_relevance=request.args.get('sort') == 'relevance'
+    )
     
     # 准备响应数据
-    logs = [log.to_dict() for log in pagination.items]
+    logs = [log.to_dict(fields) for log in items]
     
     return jsonify({
         'logs': logs,
-        'total': pagination.total,
-        'pages': pagination.pages,
+        'total': total,
+        'pages': pages,
         'page': page
     })
 
+def export_value(value):
+    """导出时的JSON序列化：时间使用ISO格式"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def export_csv_value(log, name):
+    """导出CSV时的单元格：params和result还原为JSON文本"""
+    value = getattr(log, name)
+    if name in ('params', 'result'):
+        value = decode_payload_text(value)
+    if value is None:
+        return ''
+    return export_value(value) if isinstance(value, datetime) else value
+
+def export_lines(build_query, models, export_format, max_id, fields=None):
+    """
+    逐批读取日志并生成导出内容
+    
+    按 (created_at, id) 倒序、每批EXPORT_BATCH_SIZE条以键集方式读取，每批一个短事务，
+    不会长时间占用读锁阻塞日志写入；只导出ID不超过max_id的日志，导出过程中新写入的日志不会混入。
+    
+    Args:
+        build_query: 接收日志映射类、返回 (已应用过滤条件的查询, 相关度) 的函数
+        models: 日志映射类列表（热分区在前，归档分区按时间倒序）
+        export_format: 导出格式
+        max_id: 导出开始时的最大日志ID
+        fields: 只导出这些字段，为None时导出全部字段
+        
+    Yields:
+        文本块
+    """
+    columns = [column.name for column in Log.__table__.columns if fields is None or column.name in fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(columns)
+    
+    for model in models:
+        after = None
+        while True:
+            query = build_query(model)[0].filter(model.id <= max_id)
+            if after:
+                query = older_than(query, model, *after)
+            batch = query.order_by(model.created_at.desc(), model.id.desc()).limit(EXPORT_BATCH_SIZE).all()
+            
+            for log in batch:
+                if export_format == 'csv':
+                    writer.writerow([export_csv_value(log, name) for name in columns])
+                else:
+                    buffer.write(json.dumps(log.to_dict(fields), ensure_ascii=False, default=export_value))
+                    buffer.write('\n')
+                
+                if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            
+            # 结束本批的读事务（先记下游标，回滚后访问实例属性会重新加载）
+            if batch:
+                after = (batch[-1].created_at, batch[-1].id)
+            db.session.rollback()
+            if len(batch) < EXPORT_BATCH_SIZE:
+                break
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks):
+    """
+    流式gzip压缩
+    
+    Args:
+        chunks: 文本块迭代器
+        
+    Yields:
+        压缩后的字节块
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+@log_bp.route('/export', methods=['GET'])
+def export_logs():
+    """
+    流式导出日志，过滤参数同日志列表
+    
+    format=ndjson（默认）或csv，gzip=true 时输出gzip压缩文件，fields 指定导出的字段。
+    内容边读边写，内存占用与导出的日志量无关。
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"不支持的导出格式: {export_format}"}), 400
+    compress = request.args.get('gzip', 'false').lower() in ('true', '1')
+    try:
+        fields = parse_fields(Log, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # 构建查询
+    build_query, models = log_query_builder(request.args, fields)
+    
+    # 导出开始时的最大ID（日志ID全局递增，热分区的最大ID即为全局最大ID）
+    max_id = db.session.query(func.max(Log.id)).scalar()
+    if max_id is None:
+        max_id = max([model.partition_max_id or 0 for model in models[1:]] or [0])
+    db.session.rollback()
+    
+    chunks = export_lines(build_query, models, export_format, max_id, fields)
+    filename = f"logs-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@log_bp.route('/stream', methods=['GET'])
+def stream_logs():
+    """
+    以Server-Sent Events实时推送新写入的日志
+    
+    支持按level、tool_id过滤；空闲时每LOG_STREAM_HEARTBEAT秒发送一次心跳。
+    断线重连时浏览器自动带上Last-Event-ID，补发缓冲区中错过的日志；
+    超出缓冲范围时先发送reset事件，客户端应重新加载日志列表。
+    """
+    level = request.args.get('level')
+    if level and level not in LOG_LEVELS:
+        return jsonify({'error': f"无效的日志级别: {level}"}), 400
+    tool_id = request.args.get('tool_id', type=int)
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    subscription = log_feed.subscribe(level, tool_id, last_event_id)
+    if subscription is None:
+        return jsonify({'error': '实时日志连接数已达上限'}), 503, {'Retry-After': str(STREAM_RETRY_MS // 1000)}
+    
+    def format_event(event):
+        return f"id: {event.id}\nevent: log\ndata: {event.data}\n\n"
+    
+    def generate():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            if subscription.gap:
+                yield "event: reset\ndata: {}\n\n"
+            for event in subscription.replay:
+                yield format_event(event)
+            subscription.replay = []
+            
+            while True:
+                try:
+                    event = subscription.queue.get(timeout=Config.LOG_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # 心跳同时用于发现已断开的连接
+                    yield ": heartbeat\n\n"
+                    continue
+                
+                if subscription.dropped:
+                    dropped, subscription.dropped = subscription.dropped, 0
+                    yield f"event: overflow\ndata: {json.dumps({'dropped': dropped})}\n\n"
+                yield format_event(event)
+        finally:
+            log_feed.unsubscribe(subscription)
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @log_bp.route('/<int:log_id>', methods=['GET'])
 def get_log(log_id):
     """获取单个日志详情"""
-    log = Log.query.get_or_404(log_id)
+    log = log_partitions.find(log_id)
+    if not log:
+        abort(404)
     return jsonify(log.to_dict())
 
 @log_bp.route('/', methods=['POST'])
@@ -101,53 +529,226 @@ def create_log():
     db.session.add(log)
     db.session.commit()
     
+    # 推送给实时日志订阅者
+    log_feed.publish([{column.name: getattr(log, column.name) for column in Log.__table__.columns}])
+    
     return jsonify(log.to_dict()), 201
 
+def parse_bulk_records():
+    """
+    解析批量上报的请求体：JSON数组、{"logs": [...]} 或NDJSON（每行一个JSON对象）
+    
+    Returns:
+        (记录列表, 无法解析的记录位置集合) 元组，NDJSON中无法解析的行在记录列表中为None；
+        请求体格式无效时抛出ValueError
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        records, errors = [], set()
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                errors.add(len(records))
+                records.append(None)
+        return records, errors
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('logs')
+    if not isinstance(data, list):
+        raise ValueError('请求体应为日志数组或NDJSON')
+    return data, set()
+
+def validate_bulk_record(record, tool_ids):
+    """
+    校验一条批量上报的日志
+    
+    Args:
+        record: 日志记录
+        tool_ids: 存在的工具ID集合
+        
+    Returns:
+        错误信息，校验通过返回None
+    """
+    if not isinstance(record, dict):
+        return '日志记录应为JSON对象'
+    if not record.get('message') or not isinstance(record.get('message'), str):
+        return '日志消息是必需的'
+    tool_id = record.get('tool_id')
+    if tool_id and tool_id not in tool_ids:
+        return f"工具ID {tool_id} 不存在"
+    for key in ('duration', 'queue_time'):
+        value = record.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+            return f"{key} 应为数字"
+    created_at = record.get('created_at')
+    if created_at is not None:
+        moment = parse_datetime(created_at) if isinstance(created_at, str) else None
+        if moment is None:
+            return 'created_at 应为ISO格式的时间'
+        if moment > datetime.utcnow() + timedelta(seconds=Config.LOG_BULK_MAX_CLOCK_SKEW):
+            return 'created_at 不能晚于当前时间'
+    return None
+
+@log_bp.route('/bulk', methods=['POST'])
+def bulk_create_logs():
+    """
+    批量上报日志
+    
+    请求体为JSON数组（或 {"logs": [...]}），Content-Type为application/x-ndjson时每行一条。
+    每条记录可带ISO格式的created_at（补报历史日志），晚于当前时间超过LOG_BULK_MAX_CLOCK_SKEW秒的记录无效。
+    工具ID用一次查询校验，所有有效记录用一条批量INSERT在一个事务中写入；
+    无效记录在errors中按位置返回，atomic=true 时有任何无效记录则全部不写入。
+    """
+    try:
+        records, parse_errors = parse_bulk_records()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if len(records) > Config.LOG_BULK_MAX_RECORDS:
+        return jsonify({'error': f"单次最多上报 {Config.LOG_BULK_MAX_RECORDS} 条日志"}), 413
+    
+    # 一次查询校验所有工具ID
+    requested_ids = {
+        record.get('tool_id') for record in records
+        if isinstance(record, dict) and isinstance(record.get('tool_id'), int)
+    }
+    tool_ids = set()
+    if requested_ids:
+        tool_ids = {row[0] for row in db.session.query(Tool.id).filter(Tool.id.in_(requested_ids))}
+    
+    logs, errors = [], []
+    for index, record in enumerate(records):
+        error = '无效的JSON' if index in parse_errors else validate_bulk_record(record, tool_ids)
+        if error:
+            errors.append({'index': index, 'error': error})
+            continue
+        log = Log(
+            message=record.get('message'),
+            tool_id=record.get('tool_id'),
+            level=record.get('level', 'info'),
+            params=record.get('params'),
+            result=record.get('result'),
+            duration=record.get('duration'),
+            caller=record.get('caller'),
+            queue_time=record.get('queue_time')
+        )
+        # 保留日志产生时的时间，未提供时取写入时刻
+        if record.get('created_at'):
+            log.created_at = parse_datetime(record['created_at'])
+        logs.append(log)
+    
+    atomic = request.args.get('atomic', 'false').lower() in ('true', '1')
+    if errors and (atomic or not logs):
+        return jsonify({'inserted': 0, 'failed': len(errors), 'errors': errors}), 400
+    
+    inserted = log_writer.write_sync(logs)
+    
+    return jsonify({
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': errors
+    }), 201 if not errors else 207
+
 @log_bp.route('/<int:log_id>', methods=['DELETE'])
 def delete_log(log_id):
     """删除日志"""
-    log = Log.query.get_or_404(log_id)
+    log = log_partitions.find(log_id)
+    if not log:
+        abort(404)
     
     # 删除日志
     db.session.delete(log)
+    log_partitions.discount(type(log), 1)
     db.session.commit()
     
     return jsonify({'message': f"日志ID {log_id} 已删除"}), 200
 
 @log_bp.route('/clear', methods=['POST'])
 def clear_logs():
-    """清除日志，支持条件过滤"""
+    """
+    清除日志，支持条件过滤
+    
+    清除在后台按主键区间分批执行，立即返回202和任务ID，
+    通过 GET /api/logs/clear/<job_id> 查询进度。
+    """
     # 获取请求数据
     data = request.json or {}
     
-    # 构建查询
-    query = Log.query
-    
-    # 按级别过滤
-    if data.get('level') and data.get('level') in LOG_LEVELS:
-        query = query.filter(Log.level == data.get('level'))
-    
-    # 按工具ID过滤
-    if data.get('tool_id'):
-        query = query.filter(Log.tool_id == data.get('tool_id'))
+    # 构建过滤条件
+    level = data.get('level') if data.get('level') in LOG_LEVELS else None
+    tool_id = data.get('tool_id')
+    cutoff_date = None
+    filters = {}
     
-    # 按日期范围过滤
+    if level:
+        filters['level'] = level
+    if tool_id:
+        filters['tool_id'] = tool_id
     if data.get('days_before'):
         cutoff_date = datetime.utcnow() - timedelta(days=int(data.get('days_before')))
-        query = query.filter(Log.created_at < cutoff_date)
+        filters['days_before'] = int(data.get('days_before'))
     
-    # 获取要删除的日志数量
-    count = query.count()
+    def criteria(model):
+        """一个日志分区的过滤条件"""
+        conditions = []
+        
+        # 按级别过滤
+        if level:
+            conditions.append(model.level == level)
+        
+        # 按工具ID过滤
+        if tool_id:
+            conditions.append(model.tool_id == tool_id)
+        
+        # 按日期范围过滤
+        if cutoff_date:
+            conditions.append(model.created_at < cutoff_date)
+        return conditions
     
-    # 执行删除
-    query.delete()
-    db.session.commit()
+    # 采样汇总按相同条件直接删除
+    log_sampler.clear(cutoff_date, level, tool_id)
     
-    return jsonify({'message': f"已清除 {count} 条日志记录"})
+    # 提交后台删除任务；只按日期清除时，整个早于截止时间的归档分区在任务中整表删除
+    models = log_partitions.models(end=cutoff_date)
+    drop_before = cutoff_date if cutoff_date and not level and not tool_id else None
+    job = log_cleanup.submit(current_app._get_current_object(), criteria, filters, models, drop_before)
+    
+    return jsonify({
+        'message': '日志清除任务已提交',
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('log.get_clear_job', job_id=job.id)
+    }), 202
+
+@log_bp.route('/clear/<job_id>', methods=['GET'])
+def get_clear_job(job_id):
+    """查询日志清除任务的进度"""
+    job = log_cleanup.get(job_id)
+    if not job:
+        return jsonify({'error': f"任务 {job_id} 不存在或已过期"}), 404
+    
+    return jsonify(job.to_dict())
+
+@log_bp.route('/clear/<job_id>/cancel', methods=['POST'])
+def cancel_clear_job(job_id):
+    """取消日志清除任务，已删除的日志不会恢复"""
+    job = log_cleanup.get(job_id)
+    if not job:
+        return jsonify({'error': f"任务 {job_id} 不存在或已过期"}), 404
+    
+    if job.done:
+        return jsonify({'error': f"任务 {job_id} 已结束", 'job': job.to_dict()}), 409
+    
+    log_cleanup.cancel(job_id)
+    
+    return jsonify({'message': f"任务 {job_id} 已请求取消", 'job': job.to_dict()})
 
 @log_bp.route('/tool/<int:tool_id>', methods=['GET'])
 def get_tool_logs(tool_id):
-    """获取指定工具的日志"""
+    """获取指定工具的日志，分页参数和fields同日志列表"""
     # 验证工具是否存在
     tool = Tool.query.get_or_404(tool_id)
     
@@ -156,23 +757,43 @@ def get_tool_logs(tool_id):
     per_page = request.args.get('per_page', 20, type=int)
     level = request.args.get('level')
     
-    # 构建查询
-    query = Log.query.filter(Log.tool_id == tool_id)
+    try:
+        fields = parse_fields(Log, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def build_query(model):
+        """为一个日志分区构建查询"""
+        query = db.session.query(model).filter(model.tool_id == tool_id)
+        if fields:
+            query = query.options(load_fields(model, fields, 'created_at'))
+        
+        # 按级别过滤
+        if level and level in LOG_LEVELS:
+            query = query.filter(model.level == level)
+        return query, None
     
-    # 按级别过滤
-    if level and level in LOG_LEVELS:
-        query = query.filter(Log.level == level)
+    models = log_partitions.models()
+    
+    # 游标分页
+    if is_cursor_mode():
+        try:
+            data = cursor_paginate(build_query, models, request.args.get('cursor'), per_page, wants_total(), fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        data['tool'] = tool.name
+        return jsonify(data)
     
     # 分页
-    pagination = query.order_by(Log.created_at.desc()).paginate(page=page, per_page=per_page)
+    items, total, pages = page_paginate(build_query, models, page, per_page)
     
     # 准备响应数据
-    logs = [log.to_dict() for log in pagination.items]
+    logs = [log.to_dict(fields) for log in items]
     
     return jsonify({
         'tool': tool.name,
         'logs': logs,
-        'total': pagination.total,
-        'pages': pagination.pages,
+        'total': total,
+        'pages': pages,
         'page': page
-    }) 
\ No newline at end of file
+    })
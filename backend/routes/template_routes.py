@@ -3,22 +3,33 @@
 from flask import Blueprint, request, jsonify
 from backend.models.template import Template
 from backend.models.tool import Tool, TOOL_TYPES
-from backend.models.db import db
+from backend.models.db import db, parse_fields, load_fields
 
 # 创建模板蓝图
 template_bp = Blueprint('template', __name__)
 
 @template_bp.route('/', methods=['GET'])
 def get_templates():
-    """获取模板列表，支持过滤和分页"""
+    """
+    获取模板列表，支持过滤和分页
+    
+    fields 为逗号分隔的字段名时只返回这些字段（id总是返回），未请求的大文本列不会加载和解析。
+    """
     # 获取查询参数
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     template_type = request.args.get('type')
     search = request.args.get('search')
     
+    try:
+        fields = parse_fields(Template, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     # 构建查询
     query = Template.query
+    if fields:
+        query = query.options(load_fields(Template, fields))
     
     # 按类型过滤
     if template_type and template_type in TOOL_TYPES:
@@ -37,7 +48,7 @@ def get_templates():
     pagination = query.order_by(Template.name).paginate(page=page, per_page=per_page)
     
     # 准备响应数据
-    templates = [template.to_dict() for template in pagination.items]
+    templates = [template.to_dict(fields) for template in pagination.items]
     
     return jsonify({
         'templates': templates,
@@ -1,16 +1,28 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, url_for, Response, stream_with_context
+import json
 from backend.models.tool import Tool, TOOL_TYPES, TOOL_STATUS
-from backend.models.db import db
-from datetime import datetime
+from backend.models.db import db, parse_fields, load_fields
+from backend.config import Config
+from backend.services.tool_service import ToolService
+from backend.services.process_manager import process_registry
+from backend.services.result_cache import result_cache
+from backend.services.health_monitor import health_monitor
+from backend.services.circuit_breaker import circuit_breakers
+from backend.services.log_sampler import log_sampler
+from backend.services.job_service import job_manager, JobQueueFullError
 
 # 创建工具蓝图
 tool_bp = Blueprint('tool', __name__)
 
 @tool_bp.route('/', methods=['GET'])
 def get_tools():
-    """获取工具列表，支持过滤和分页"""
+    """
+    获取工具列表，支持过滤和分页
+    
+    fields 为逗号分隔的字段名时只返回这些字段（id总是返回），未请求的大文本列不会加载和解析。
+    """
     # 获取查询参数
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
@@ -18,8 +30,15 @@ def get_tools():
     status = request.args.get('status')
     search = request.args.get('search')
     
+    try:
+        fields = parse_fields(Tool, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     # 构建查询
     query = Tool.query
+    if fields:
+        query = query.options(load_fields(Tool, fields))
     
     # 按类型过滤
     if tool_type and tool_type in TOOL_TYPES:
@@ -41,7 +60,7 @@ def get_tools():
     pagination = query.order_by(Tool.created_at.desc()).paginate(page=page, per_page=per_page)
     
     # 准备响应数据
-    tools = [tool.to_dict() for tool in pagination.items]
+    tools = [tool.to_dict(fields) for tool in pagination.items]
     
     return jsonify({
         'tools': tools,
@@ -120,6 +139,15 @@ def update_tool(tool_id):
     # 保存更新
     db.session.commit()
     
+    # 命令或配置变更后停止旧进程并重置熔断器，下次调用时按新配置启动
+    if 'command' in data or 'config' in data:
+        process_registry.stop(tool_id)
+        circuit_breakers.reset(tool_id)
+        log_sampler.reset(tool_id)
+    
+    # 工具变更后清除其结果缓存
+    result_cache.invalidate(tool_id)
+    
     return jsonify(tool.to_dict())
 
 @tool_bp.route('/<int:tool_id>', methods=['DELETE'])
@@ -127,6 +155,13 @@ def delete_tool(tool_id):
     """删除工具"""
     tool = Tool.query.get_or_404(tool_id)
     
+    # 停止工具进程并清除结果缓存、健康信息、熔断器和采样令牌桶
+    process_registry.stop(tool_id)
+    result_cache.invalidate(tool_id)
+    health_monitor.forget(tool_id)
+    circuit_breakers.reset(tool_id)
+    log_sampler.reset(tool_id)
+    
     # 删除工具
     db.session.delete(tool)
     db.session.commit()
@@ -138,9 +173,9 @@ def activate_tool(tool_id):
     """激活工具"""
     tool = Tool.query.get_or_404(tool_id)
     
-    # 更新状态
-    tool.status = 'active'
-    db.session.commit()
+    # 启动工具进程并更新状态
+    if not ToolService.start_tool(tool_id):
+        return jsonify({'error': f"工具 '{tool.name}' 启动失败", 'tool': tool.to_dict()}), 500
     
     return jsonify({'message': f"工具 '{tool.name}' 已激活", 'tool': tool.to_dict()})
 
@@ -149,30 +184,213 @@ def deactivate_tool(tool_id):
     """停用工具"""
     tool = Tool.query.get_or_404(tool_id)
     
-    # 更新状态
-    tool.status = 'inactive'
-    db.session.commit()
+    # 停止工具进程并更新状态
+    if not ToolService.stop_tool(tool_id):
+        return jsonify({'error': f"工具 '{tool.name}' 停止失败", 'tool': tool.to_dict()}), 500
     
     return jsonify({'message': f"工具 '{tool.name}' 已停用", 'tool': tool.to_dict()})
 
+@tool_bp.route('/<int:tool_id>/status', methods=['GET'])
+def get_tool_status(tool_id):
+    """获取工具的实时状态（进程存活、延迟、并发情况）"""
+    result = ToolService.check_tool_status(tool_id)
+    if not result['success']:
+        return jsonify({'error': result['error']}), 404
+    
+    return jsonify(result)
+
 @tool_bp.route('/<int:tool_id>/invoke', methods=['POST'])
 def invoke_tool(tool_id):
-    """调用工具"""
+    """调用工具，?async=true 时提交为异步任务并立即返回任务ID"""
     tool = Tool.query.get_or_404(tool_id)
     
     # 检查工具状态
     if tool.status != 'active':
         return jsonify({'error': f"工具 '{tool.name}' 未激活"}), 400
     
-    # 更新调用信息
-    tool.last_invoked_at = datetime.utcnow()
-    tool.invoke_count += 1
-    db.session.commit()
+    # 单次调用超时（秒），不超过工具配置的超时
+    timeout = request.args.get('timeout', type=float)
+    
+    # 异步模式：提交到任务线程池
+    if request.args.get('async', 'false').lower() in ('true', '1'):
+        try:
+            job = job_manager.submit(
+                current_app._get_current_object(),
+                tool_id,
+                request.get_json(silent=True) or {},
+                caller=request.remote_addr,
+                timeout=timeout
+            )
+        except JobQueueFullError as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+        
+        return jsonify({
+            'message': f"工具 '{tool.name}' 调用任务已提交",
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('tool.get_job', job_id=job.id)
+        }), 202
+    
+    # 通过常驻工具进程执行调用
+    result = ToolService.invoke_tool(
+        tool_id,
+        request.get_json(silent=True) or {},
+        caller=request.remote_addr,
+        timeout=timeout
+    )
+    if result.get('busy'):
+        return jsonify({'error': result['error']}), 429, {'Retry-After': str(result['retry_after'])}
+    
+    if result.get('circuit_open'):
+        return jsonify({'error': result['error']}), 503, {'Retry-After': str(result['retry_after'])}
+    
+    if result.get('timeout'):
+        return jsonify({
+            'error': f"工具 '{tool.name}' 调用失败: {result['error']}",
+            'duration': result.get('duration')
+        }), 504
+    
+    if not result['success']:
+        return jsonify({
+            'error': f"工具 '{tool.name}' 调用失败: {result['error']}",
+            'duration': result.get('duration')
+        }), 500
     
-    # TODO: 实现实际的工具调用逻辑
-    # 这里仅作为示例，返回模拟的调用结果
     return jsonify({
         'message': f"工具 '{tool.name}' 调用成功",
         'tool': tool.to_dict(),
-        'result': {'status': 'success', 'data': {}}
-    }) 
\ No newline at end of file
+        'result': result['result'],
+        'duration': result['duration'],
+        'queue_time': result.get('queue_time')
+    })
+
+@tool_bp.route('/<int:tool_id>/invoke/stream', methods=['POST'])
+def stream_invoke_tool(tool_id):
+    """
+    流式调用工具，逐个推送进度通知和结果内容
+    
+    默认以Server-Sent Events返回，?format=ndjson 时每行一个JSON对象。
+    """
+    tool = Tool.query.get_or_404(tool_id)
+    
+    # 检查工具状态
+    if tool.status != 'active':
+        return jsonify({'error': f"工具 '{tool.name}' 未激活"}), 400
+    
+    events = ToolService.stream_tool(
+        tool_id,
+        request.get_json(silent=True) or {},
+        caller=request.remote_addr,
+        timeout=request.args.get('timeout', type=float)
+    )
+    
+    # 先取第一个事件：调用未能开始时仍可返回普通的错误响应
+    event, data = next(events)
+    if event == 'error':
+        events.close()
+        if data.get('busy'):
+            return jsonify({'error': data['error']}), 429, {'Retry-After': str(data['retry_after'])}
+        if data.get('circuit_open'):
+            return jsonify({'error': data['error']}), 503, {'Retry-After': str(data['retry_after'])}
+        return jsonify({'error': f"工具 '{tool.name}' 调用失败: {data['error']}"}), 500
+    
+    ndjson = request.args.get('format') == 'ndjson'
+    
+    def generate():
+        yield format_event(event, data)
+        for name, payload in events:
+            yield format_event(name, payload)
+    
+    def format_event(name, payload):
+        if ndjson:
+            return json.dumps(dict(payload, event=name), ensure_ascii=False, default=str) + '\n'
+        if name == 'heartbeat':
+            return ': heartbeat\n\n'
+        return f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@tool_bp.route('/batch_invoke', methods=['POST'])
+def batch_invoke():
+    """
+    批量调用工具
+    
+    请求体支持两种格式：
+    - {"items": [{"tool_id": 1, "params": {...}}, ...]}
+    - {"tool_id": 1, "params_list": [{...}, {...}]}
+    可选 max_concurrency 指定并发数（不超过系统上限）。
+    """
+    data = request.get_json(silent=True) or {}
+    
+    # 解析调用条目
+    if 'items' in data:
+        if not isinstance(data['items'], list):
+            return jsonify({'error': 'items必须是列表'}), 400
+        items = []
+        for index, item in enumerate(data['items']):
+            if not isinstance(item, dict) or not isinstance(item.get('tool_id'), int):
+                return jsonify({'error': f"第 {index} 个条目缺少有效的tool_id"}), 400
+            items.append((item['tool_id'], item.get('params') or {}))
+    elif 'tool_id' in data and isinstance(data.get('params_list'), list):
+        if not isinstance(data['tool_id'], int):
+            return jsonify({'error': 'tool_id必须是整数'}), 400
+        items = [(data['tool_id'], params or {}) for params in data['params_list']]
+    else:
+        return jsonify({'error': '请提供items或tool_id与params_list'}), 400
+    
+    if not items:
+        return jsonify({'error': '调用条目不能为空'}), 400
+    
+    if len(items) > Config.BATCH_MAX_ITEMS:
+        return jsonify({'error': f"单次最多调用 {Config.BATCH_MAX_ITEMS} 条"}), 400
+    
+    max_concurrency = data.get('max_concurrency')
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+        return jsonify({'error': 'max_concurrency必须是正整数'}), 400
+    
+    responses = ToolService.batch_invoke(
+        current_app._get_current_object(),
+        items,
+        max_workers=max_concurrency,
+        caller=request.remote_addr
+    )
+    
+    results = []
+    for index, ((tool_id, _), response) in enumerate(zip(items, responses)):
+        results.append(dict(response, index=index, tool_id=tool_id))
+    
+    succeeded = sum(1 for response in responses if response['success'])
+    
+    return jsonify({
+        'results': results,
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded
+    })
+
+@tool_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """获取异步调用任务的状态和结果"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': f"任务 {job_id} 不存在或已过期"}), 404
+    
+    return jsonify(job.to_dict())
+
+@tool_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消异步调用任务，执行中的任务会终止工具进程"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': f"任务 {job_id} 不存在或已过期"}), 404
+    
+    if job.done:
+        return jsonify({'error': f"任务 {job_id} 已结束", 'job': job.to_dict()}), 409
+    
+    job_manager.cancel(job_id)
+    
+    return jsonify({'message': f"任务 {job_id} 已请求取消", 'job': job.to_dict()})
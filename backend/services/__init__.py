@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from .mcp_client import MCPClient, MCPError, MCPConnectionClosed, MCPTimeoutError
+from .process_manager import ToolProcess, ToolProcessError, ToolTimeoutError, ToolCancelledError, process_registry
+from .tool_service import ToolService
+from .job_service import Job, JobManager, CancelToken, JobQueueFullError, job_manager
+from .result_cache import ResultCache, result_cache
+from .single_flight import SingleFlight, single_flight
+from .bulkhead import Bulkhead, ToolBusyError, bulkhead_registry
+from .health_monitor import HealthMonitor, health_monitor
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, circuit_breakers
+from .invoke_stats import InvokeStats, invoke_stats
+from .log_feed import LogFeed, LogSubscription, log_feed
+from .log_writer import LogWriter, log_writer
+from .log_search import LogSearch, log_search
+from .log_cleanup import LogCleanupJob, LogCleanupManager, log_cleanup
+from .log_partitions import LogPartitionManager, log_partitions
+from .log_sampler import TokenBucket, LogSampler, log_sampler
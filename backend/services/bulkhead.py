@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import math
+import time
+import threading
+from contextlib import contextmanager
+from backend.config import Config
+
+
+class ToolBusyError(Exception):
+    """工具并发已满且排队队列已满（或排队超时）"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """
+    单个工具的并发隔离舱
+
+    同时执行的调用数不超过max_concurrency，超出的调用最多排队max_queue个，
+    队列已满或排队超时时立即拒绝，避免一个繁忙的工具占满所有工作线程。
+    拒绝时的建议重试秒数（Retry-After）按平均占用时长和排在前面的调用数估算。
+    """
+
+    def __init__(self, max_concurrency, max_queue, queue_timeout):
+        """
+        初始化隔离舱
+
+        Args:
+            max_concurrency: 最大并发执行数
+            max_queue: 最大排队数
+            queue_timeout: 最长排队秒数
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        # 槽位平均占用秒数（指数移动平均），尚无数据时为None
+        self.avg_hold = None
+        self._cond = threading.Condition()
+
+    def resize(self, max_concurrency, max_queue, queue_timeout):
+        """
+        调整限制（工具配置变更后）
+
+        Args:
+            max_concurrency: 最大并发执行数
+            max_queue: 最大排队数
+            queue_timeout: 最长排队秒数
+        """
+        with self._cond:
+            self.max_concurrency = max_concurrency
+            self.max_queue = max_queue
+            self.queue_timeout = queue_timeout
+            self._cond.notify_all()
+
+    def acquire(self):
+        """
+        获取执行槽位
+
+        Returns:
+            排队等待的秒数
+        """
+        start = time.monotonic()
+        with self._cond:
+            if self.active >= self.max_concurrency:
+                if self.waiting >= self.max_queue:
+                    raise ToolBusyError(f"工具繁忙：{self.active} 个调用执行中，排队已满", self._retry_after())
+
+                self.waiting += 1
+                try:
+                    deadline = start + self.queue_timeout
+                    while self.active >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise ToolBusyError(f"工具繁忙：排队超过 {self.queue_timeout} 秒", self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+        return time.monotonic() - start
+
+    def release(self, held=None):
+        """
+        释放执行槽位
+
+        Args:
+            held: 本次占用槽位的秒数，用于估算建议重试时间；未实际调用时为None
+        """
+        with self._cond:
+            self.active -= 1
+            if held is not None:
+                self.avg_hold = held if self.avg_hold is None else self.avg_hold * 0.8 + held * 0.2
+            self._cond.notify()
+
+    def _retry_after(self):
+        """
+        估算建议重试秒数：排在前面的调用（排队数加1）按平均占用时长、以max_concurrency路并发执行完所需的时间
+
+        Returns:
+            1到TOOL_RETRY_AFTER_MAX之间的整数秒，尚无占用时长数据时为1
+        """
+        if not self.avg_hold:
+            return 1
+        estimate = self.avg_hold * (self.waiting + 1) / self.max_concurrency
+        return int(min(max(math.ceil(estimate), 1), Config.TOOL_RETRY_AFTER_MAX))
+
+    @contextmanager
+    def slot(self):
+        """
+        在槽位内执行的上下文管理器
+
+        Yields:
+            排队等待的秒数
+        """
+        waited = self.acquire()
+        acquired_at = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - acquired_at)
+
+    def stats(self):
+        """当前并发和排队情况"""
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'avg_hold_ms': round(self.avg_hold * 1000, 2) if self.avg_hold is not None else None
+        }
+
+
+class BulkheadRegistry:
+    """按工具ID管理隔离舱"""
+
+    def __init__(self):
+        self._bulkheads = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_limits(tool):
+        """
+        读取工具配置中的并发限制
+
+        工具配置示例：{"max_concurrency": 4, "max_queue": 16, "queue_timeout": 30}
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            (最大并发数, 最大排队数, 最长排队秒数) 元组
+        """
+        config = tool.get_config()
+        try:
+            max_concurrency = max(1, int(config.get('max_concurrency', Config.TOOL_MAX_CONCURRENCY)))
+            max_queue = max(0, int(config.get('max_queue', Config.TOOL_MAX_QUEUE)))
+            queue_timeout = max(0.0, float(config.get('queue_timeout', Config.TOOL_QUEUE_TIMEOUT)))
+        except (TypeError, ValueError):
+            return Config.TOOL_MAX_CONCURRENCY, Config.TOOL_MAX_QUEUE, Config.TOOL_QUEUE_TIMEOUT
+        return max_concurrency, max_queue, queue_timeout
+
+    def get(self, tool):
+        """
+        获取工具的隔离舱，限制与当前配置不一致时就地调整
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            Bulkhead实例
+        """
+        limits = self.get_limits(tool)
+        with self._lock:
+            bulkhead = self._bulkheads.get(tool.id)
+            if bulkhead is None:
+                bulkhead = Bulkhead(*limits)
+                self._bulkheads[tool.id] = bulkhead
+        if (bulkhead.max_concurrency, bulkhead.max_queue, bulkhead.queue_timeout) != limits:
+            bulkhead.resize(*limits)
+        return bulkhead
+
+    def stats(self, tool_id):
+        """
+        获取工具的并发和排队情况
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            统计字典，没有隔离舱时返回None
+        """
+        bulkhead = self._bulkheads.get(tool_id)
+        return bulkhead.stats() if bulkhead else None
+
+
+# 全局隔离舱注册表
+bulkhead_registry = BulkheadRegistry()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import threading
+from collections import deque
+from backend.config import Config
+
+# 熔断器状态枚举
+CIRCUIT_STATES = [
+    'closed',        # 关闭（正常放行）
+    'open',          # 打开（快速失败）
+    'half_open'      # 半开（放行少量探测调用）
+]
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开，调用被快速拒绝"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    单个工具的熔断器
+
+    在最近window次调用中，调用数不少于min_calls且错误率或慢调用率达到阈值时打开，
+    打开期间直接拒绝调用；open_seconds秒后进入半开状态，最多放行half_open_calls个探测调用，
+    探测全部成功则关闭，任一失败则重新打开。
+    """
+
+    def __init__(self, settings):
+        """
+        初始化熔断器
+
+        Args:
+            settings: 熔断参数字典（见CircuitBreakerRegistry.get_settings）
+        """
+        self.settings = settings
+        self.state = 'closed'
+        self.opened_at = None
+        self.trips = 0
+        self._outcomes = deque(maxlen=settings['window'])
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def configure(self, settings):
+        """
+        更新熔断参数
+
+        Args:
+            settings: 熔断参数字典
+        """
+        with self._lock:
+            if settings['window'] != self.settings['window']:
+                self._outcomes = deque(self._outcomes, maxlen=settings['window'])
+            self.settings = settings
+
+    def _refresh(self):
+        """打开时间到期后进入半开状态（需持有锁）"""
+        if self.state == 'open' and time.monotonic() - self.opened_at >= self.settings['open_seconds']:
+            self.state = 'half_open'
+            self._probes = 0
+            self._probe_successes = 0
+
+    def retry_after(self):
+        """距离进入半开状态的剩余秒数"""
+        if self.state != 'open':
+            return 1
+        remaining = self.settings['open_seconds'] - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def is_open(self):
+        """是否处于打开状态（不占用探测名额）"""
+        with self._lock:
+            self._refresh()
+            return self.state == 'open'
+
+    def allow(self):
+        """
+        申请执行一次调用；半开状态下占用一个探测名额
+
+        Returns:
+            允许执行返回True
+        """
+        with self._lock:
+            self._refresh()
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and self._probes < self.settings['half_open_calls']:
+                self._probes += 1
+                return True
+            return False
+
+    def record(self, success, latency_ms=None):
+        """
+        记录调用结果
+
+        Args:
+            success: 是否成功
+            latency_ms: 执行毫秒数
+        """
+        slow = latency_ms is not None and latency_ms >= self.settings['slow_call_ms']
+        with self._lock:
+            if self.state == 'half_open':
+                if not success or slow:
+                    self._trip()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.settings['half_open_calls']:
+                        self.state = 'closed'
+                        self._outcomes.clear()
+                return
+
+            if self.state != 'closed':
+                return
+
+            self._outcomes.append((success, slow))
+            if len(self._outcomes) < self.settings['min_calls']:
+                return
+
+            total = len(self._outcomes)
+            error_rate = sum(1 for ok, _ in self._outcomes if not ok) / total
+            slow_rate = sum(1 for _, is_slow in self._outcomes if is_slow) / total
+            if error_rate >= self.settings['error_rate'] or slow_rate >= self.settings['slow_call_rate']:
+                self._trip()
+
+    def release(self):
+        """放弃已申请的调用（如被取消），归还半开状态的探测名额"""
+        with self._lock:
+            if self.state == 'half_open' and self._probes > 0:
+                self._probes -= 1
+
+    def _trip(self):
+        """打开熔断器（需持有锁）"""
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._outcomes.clear()
+
+    def stats(self):
+        """熔断器状态"""
+        with self._lock:
+            self._refresh()
+            total = len(self._outcomes)
+            return {
+                'state': self.state,
+                'trips': self.trips,
+                'calls': total,
+                'error_rate': round(sum(1 for ok, _ in self._outcomes if not ok) / total, 3) if total else 0,
+                'retry_after': self.retry_after() if self.state == 'open' else None
+            }
+
+
+class CircuitBreakerRegistry:
+    """按工具ID管理熔断器"""
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_settings(tool):
+        """
+        读取工具配置中的熔断参数
+
+        工具配置示例：{"circuit_breaker": {"error_rate": 0.5, "slow_call_ms": 10000,
+        "slow_call_rate": 0.5, "min_calls": 20, "window": 50, "open_seconds": 30, "half_open_calls": 3}}
+        设置 "circuit_breaker": {"enabled": false} 可关闭熔断。
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            熔断参数字典，关闭熔断时返回None
+        """
+        defaults = {
+            'error_rate': Config.CIRCUIT_ERROR_RATE,
+            'slow_call_ms': Config.CIRCUIT_SLOW_CALL_MS,
+            'slow_call_rate': Config.CIRCUIT_SLOW_CALL_RATE,
+            'min_calls': Config.CIRCUIT_MIN_CALLS,
+            'window': Config.CIRCUIT_WINDOW,
+            'open_seconds': Config.CIRCUIT_OPEN_SECONDS,
+            'half_open_calls': Config.CIRCUIT_HALF_OPEN_CALLS
+        }
+        overrides = tool.get_config().get('circuit_breaker') or {}
+        if not isinstance(overrides, dict):
+            return defaults
+        if overrides.get('enabled') is False:
+            return None
+
+        settings = dict(defaults)
+        for key, default in defaults.items():
+            try:
+                settings[key] = type(default)(overrides.get(key, default))
+            except (TypeError, ValueError):
+                settings[key] = default
+        settings['window'] = max(1, settings['window'])
+        settings['min_calls'] = max(1, min(settings['min_calls'], settings['window']))
+        settings['half_open_calls'] = max(1, settings['half_open_calls'])
+        return settings
+
+    def get(self, tool):
+        """
+        获取工具的熔断器，参数与当前配置不一致时就地调整
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            CircuitBreaker实例，工具关闭熔断时返回None
+        """
+        settings = self.get_settings(tool)
+        if settings is None:
+            with self._lock:
+                self._breakers.pop(tool.id, None)
+            return None
+
+        with self._lock:
+            breaker = self._breakers.get(tool.id)
+            if breaker is None:
+                breaker = CircuitBreaker(settings)
+                self._breakers[tool.id] = breaker
+        if breaker.settings != settings:
+            breaker.configure(settings)
+        return breaker
+
+    def reset(self, tool_id):
+        """
+        重置工具的熔断器（工具变更或删除时调用）
+
+        Args:
+            tool_id: 工具ID
+        """
+        with self._lock:
+            self._breakers.pop(tool_id, None)
+
+    def stats(self, tool_id):
+        """
+        获取工具的熔断器状态
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            状态字典，没有熔断器时返回None
+        """
+        breaker = self._breakers.get(tool_id)
+        return breaker.stats() if breaker else None
+
+    def summary(self):
+        """
+        所有熔断器的状态汇总（用于仪表盘）
+
+        Returns:
+            汇总字典
+        """
+        with self._lock:
+            breakers = list(self._breakers.items())
+        summary = {'closed': 0, 'open': 0, 'half_open': 0, 'tools': []}
+        for tool_id, breaker in breakers:
+            stats = breaker.stats()
+            summary[stats['state']] += 1
+            if stats['state'] != 'closed':
+                summary['tools'].append(dict(stats, tool_id=tool_id))
+        return summary
+
+
+# 全局熔断器注册表
+circuit_breakers = CircuitBreakerRegistry()
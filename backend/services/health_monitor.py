@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from backend.config import Config
+from backend.models.tool import Tool
+from backend.models.log import Log
+from backend.models.db import db
+from backend.services.process_manager import process_registry
+from backend.services.log_writer import log_writer
+
+
+class HealthMonitor:
+    """
+    工具健康探测器
+
+    后台线程定期向每个活跃工具的空闲进程发送MCP ping，
+    把存活状态和延迟保存在内存缓存中，查询工具状态时无需访问数据库。
+    正在处理调用的进程不探测（一次只处理一个请求的MCP服务器在长调用期间无法响应ping，
+    卡死的调用由调用超时处理）。空闲进程连续多次无响应时回收，
+    没有进程在处理调用时把工具设为error状态，恢复响应后重新设为active。
+    """
+
+    def __init__(self):
+        self.app = None
+        self._health = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        """
+        绑定Flask应用并启动探测线程
+
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        if app.config.get('HEALTH_CHECK_ENABLED', True) and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        """启动探测线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='tool-health-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止探测线程"""
+        self._stopping.set()
+
+    def get(self, tool_id):
+        """
+        获取工具的健康信息缓存
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            健康信息字典，尚未探测过返回None
+        """
+        with self._lock:
+            health = self._health.get(tool_id)
+            return dict(health) if health else None
+
+    def set_status(self, tool_id, status):
+        """
+        同步工具状态到缓存（启动、停止工具时调用）
+
+        Args:
+            tool_id: 工具ID
+            status: 工具状态
+        """
+        with self._lock:
+            health = self._health.get(tool_id)
+            if health is not None:
+                health['status'] = status
+                if status == 'inactive':
+                    health.update({'alive': None, 'latency_ms': None, 'failures': 0})
+
+    def forget(self, tool_id):
+        """
+        移除工具的健康信息（删除工具时调用）
+
+        Args:
+            tool_id: 工具ID
+        """
+        with self._lock:
+            self._health.pop(tool_id, None)
+
+    def _run(self):
+        """探测循环"""
+        while not self._stopping.wait(Config.HEALTH_CHECK_INTERVAL):
+            try:
+                with self.app.app_context():
+                    self.probe_all()
+            except Exception:
+                # 探测失败（如数据库暂不可用）时等待下一轮
+                pass
+
+    def probe_all(self):
+        """探测所有活跃（或处于错误状态）的工具，并根据结果更新工具状态"""
+        tools = Tool.query.filter(Tool.status.in_(['active', 'error'])).all()
+        known_ids = set()
+        logs = []
+
+        for tool in tools:
+            known_ids.add(tool.id)
+            health = self._probe(tool)
+
+            # 连续无响应达到阈值、且没有进程正在处理调用时设为错误状态，恢复响应后重新激活
+            if tool.status == 'active' and health['failures'] >= Config.HEALTH_FAILURE_THRESHOLD and not health['busy']:
+                tool.status = 'error'
+                logs.append(Log(
+                    message=f"工具 '{tool.name}' 连续 {health['failures']} 次健康检查无响应，状态已设为错误",
+                    tool_id=tool.id,
+                    level='error'
+                ))
+            elif tool.status == 'error' and health['alive']:
+                tool.status = 'active'
+                logs.append(Log(
+                    message=f"工具 '{tool.name}' 已恢复响应，状态已设为活跃",
+                    tool_id=tool.id,
+                    level='info'
+                ))
+
+            with self._lock:
+                health['status'] = tool.status
+                health['invoke_count'] = tool.invoke_count
+                health['last_invoked_at'] = tool.last_invoked_at.isoformat() if tool.last_invoked_at else None
+                self._health[tool.id] = health
+
+        if logs:
+            db.session.commit()
+            # 状态变更日志经log_writer写入，实时日志订阅者也能收到
+            log_writer.write_many(logs)
+
+        # 停用或已删除的工具不再保留缓存
+        with self._lock:
+            for tool_id in list(self._health):
+                if tool_id not in known_ids:
+                    del self._health[tool_id]
+
+    def _probe(self, tool):
+        """
+        并发ping工具的所有空闲进程，正在处理调用的进程只计入busy
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            健康信息字典
+        """
+        previous = self.get(tool.id) or {}
+        now = datetime.utcnow().isoformat()
+        processes = process_registry.processes(tool.id)
+        pending = []
+        busy = []
+
+        for process in processes:
+            if process.in_flight and process.is_alive():
+                busy.append(process)
+                continue
+            try:
+                request_id, future = process.client.send_request('ping')
+                pending.append((process, request_id, future, time.monotonic()))
+            except Exception:
+                pending.append((process, None, None, time.monotonic()))
+
+        latencies = []
+        unresponsive = []
+        deadline = time.monotonic() + Config.HEALTH_CHECK_TIMEOUT
+        for process, request_id, future, sent_at in pending:
+            try:
+                if future is None:
+                    raise FutureTimeoutError()
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+                latencies.append((time.monotonic() - sent_at) * 1000)
+            except Exception:
+                # ping发出后进程开始处理调用，ping排在调用之后，不算无响应
+                in_call = future is not None and process.in_flight > 1 and process.is_alive()
+                if request_id is not None:
+                    process.client.cancel(request_id, 'ping超时')
+                if in_call:
+                    busy.append(process)
+                else:
+                    unresponsive.append(process)
+
+        health = {
+            'alive': None,
+            'latency_ms': None,
+            'last_seen': previous.get('last_seen'),
+            'last_checked': now,
+            'failures': 0,
+            'processes': len(processes),
+            'busy': len(busy),
+            'unresponsive': len(unresponsive)
+        }
+
+        if not processes:
+            # 本工作进程中没有该工具的进程（尚未调用或已被回收），不判定为故障
+            return health
+
+        if latencies:
+            health['alive'] = True
+            health['latency_ms'] = round(min(latencies), 2)
+            health['last_seen'] = now
+        elif unresponsive:
+            health['alive'] = False
+            health['failures'] = previous.get('failures', 0) + 1
+        else:
+            # 所有进程都在处理调用，本轮无法判断，沿用上一轮的结果
+            health['alive'] = previous.get('alive')
+            health['latency_ms'] = previous.get('latency_ms')
+            health['failures'] = previous.get('failures', 0)
+
+        # 持续无响应的空闲进程交给进程池回收并重新补足（正在处理调用的进程不会回收）
+        if health['failures'] >= Config.HEALTH_FAILURE_THRESHOLD:
+            for process in unresponsive:
+                process_registry.recycle(tool.id, process)
+
+        return health
+
+
+# 全局健康探测器
+health_monitor = HealthMonitor()
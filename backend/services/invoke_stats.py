@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import case
+from backend.config import Config
+from backend.models.tool import Tool
+from backend.models.db import db
+
+
+class InvokeStats:
+    """
+    工具调用统计的延迟写入器
+
+    调用成功时只在内存中累加调用次数和最近调用时间，
+    后台线程定期把累计值以原子的 UPDATE ... SET invoke_count = invoke_count + :n 写入数据库，
+    每次调用不再单独开启写事务，多个工作进程并发更新时计数也不会丢失。
+    """
+
+    def __init__(self):
+        self.app = None
+        # 工具ID -> [待写入次数, 最近调用时间]
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        """
+        绑定Flask应用并启动定时写入线程
+
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        if Config.INVOKE_STATS_FLUSH_INTERVAL > 0:
+            self.start()
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """启动定时写入线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='tool-invoke-stats', daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """停止定时写入线程并写入剩余的统计"""
+        self._stopping.set()
+        if self.app is not None:
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                pass
+
+    def record(self, tool_id, count=1, invoked_at=None):
+        """
+        累加工具的调用统计
+
+        未启动写入线程时（如脚本中直接使用服务或写入间隔设为0）立即写入，需在应用上下文中调用。
+
+        Args:
+            tool_id: 工具ID
+            count: 调用次数
+            invoked_at: 调用时间，默认为当前时间
+        """
+        invoked_at = invoked_at or datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(tool_id)
+            if entry is None:
+                self._pending[tool_id] = [count, invoked_at]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], invoked_at)
+
+        if self._thread is None or not self._thread.is_alive():
+            self.flush()
+
+    def pending(self, tool_id):
+        """
+        获取工具尚未写入数据库的调用次数
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            待写入次数
+        """
+        with self._lock:
+            entry = self._pending.get(tool_id)
+            return entry[0] if entry else 0
+
+    def _run(self):
+        """定时写入循环"""
+        while not self._stopping.wait(Config.INVOKE_STATS_FLUSH_INTERVAL):
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                # 写入失败的统计已放回内存，等待下一轮
+                pass
+
+    def flush(self):
+        """
+        把累计的调用统计写入数据库，每个工具一条原子UPDATE
+
+        Returns:
+            写入的工具数
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                for tool_id, (count, invoked_at) in pending.items():
+                    # 最近调用时间只前进不后退，避免多个工作进程交错写入时覆盖较新的时间
+                    Tool.query.filter(Tool.id == tool_id).update({
+                        Tool.invoke_count: db.func.coalesce(Tool.invoke_count, 0) + count,
+                        Tool.last_invoked_at: case(
+                            (Tool.last_invoked_at.is_(None), invoked_at),
+                            (Tool.last_invoked_at < invoked_at, invoked_at),
+                            else_=Tool.last_invoked_at
+                        )
+                    }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                # 写入失败时放回内存，与期间新增的统计合并
+                with self._lock:
+                    for tool_id, (count, invoked_at) in pending.items():
+                        entry = self._pending.get(tool_id)
+                        if entry is None:
+                            self._pending[tool_id] = [count, invoked_at]
+                        else:
+                            entry[0] += count
+                            entry[1] = max(entry[1], invoked_at)
+                raise
+
+            return len(pending)
+
+
+# 全局调用统计写入器
+invoke_stats = InvokeStats()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import uuid
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import Config
+from backend.services.tool_service import ToolService
+
+# 任务状态枚举
+JOB_STATUS = [
+    'pending',       # 排队中
+    'running',       # 执行中
+    'succeeded',     # 执行成功
+    'failed',        # 执行失败
+    'cancelled'      # 已取消
+]
+
+
+class JobQueueFullError(Exception):
+    """任务队列已满"""
+    pass
+
+
+class CancelToken:
+    """取消令牌，取消时依次执行已注册的回调"""
+
+    def __init__(self):
+        self._cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        """是否已取消"""
+        return self._cancelled
+
+    def add_callback(self, callback):
+        """
+        注册取消回调，已取消时立即执行
+
+        Args:
+            callback: 无参数的回调函数
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        """取消并执行回调"""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class Job:
+    """异步工具调用任务"""
+
+    def __init__(self, tool_id, params=None, caller=None, timeout=None):
+        """
+        初始化任务
+
+        Args:
+            tool_id: 工具ID
+            params: 调用参数
+            caller: 调用者信息
+            timeout: 调用超时秒数
+        """
+        self.id = uuid.uuid4().hex
+        self.tool_id = tool_id
+        self.params = params
+        self.caller = caller
+        self.timeout = timeout
+        self.cancel_token = CancelToken()
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.duration = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        """任务是否已结束"""
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'tool_id': self.tool_id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'duration': self.duration,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class JobManager:
+    """
+    异步任务管理器
+
+    工具调用提交到有界线程池中执行，请求线程立即返回任务ID，
+    慢工具不会长时间占用Web服务的同步工作进程。
+    排队和执行中的任务总数超过上限时拒绝新任务。
+    任务只保存在当前进程的内存中（取消需要操作本进程中的工具调用），
+    因此必须以单个工作进程运行（见backend/gunicorn.conf.py），进程重启后任务记录丢失。
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, result_ttl=None):
+        """
+        初始化任务管理器
+
+        Args:
+            max_workers: 线程池大小
+            max_queue: 最大排队任务数
+            result_ttl: 已完成任务的保留秒数
+        """
+        self.max_workers = max_workers or Config.JOB_WORKERS
+        self.max_queue = max_queue if max_queue is not None else Config.JOB_QUEUE_SIZE
+        self.result_ttl = result_ttl or Config.JOB_RESULT_TTL
+        self._executor = None
+        self._jobs = {}
+        self._finished = {}
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """按需创建线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tool-job')
+        return self._executor
+
+    def submit(self, app, tool_id, params=None, caller=None, timeout=None):
+        """
+        提交工具调用任务
+
+        Args:
+            app: Flask应用实例，任务线程在其应用上下文中执行
+            tool_id: 工具ID
+            params: 调用参数
+            caller: 调用者信息
+            timeout: 调用超时秒数
+
+        Returns:
+            Job实例
+        """
+        job = Job(tool_id, params, caller, timeout)
+        with self._lock:
+            self._purge()
+            if self._outstanding >= self.max_workers + self.max_queue:
+                raise JobQueueFullError('任务队列已满，请稍后重试')
+            self._outstanding += 1
+            self._jobs[job.id] = job
+            executor = self._get_executor()
+
+        executor.submit(self._run, app, job)
+        return job
+
+    def get(self, job_id):
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Job实例，不存在返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        取消任务：排队中的任务不再执行，执行中的任务终止工具调用
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Job实例，不存在返回None
+        """
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+        job.cancel_token.cancel()
+        return job
+
+    def _run(self, app, job):
+        """在线程池中执行任务"""
+        if job.cancel_token.cancelled:
+            job.error = '任务已取消'
+            job.status = 'cancelled'
+            self._finish(job)
+            return
+
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        try:
+            with app.app_context():
+                response = ToolService.invoke_tool(
+                    job.tool_id,
+                    job.params,
+                    caller=job.caller,
+                    timeout=job.timeout,
+                    cancel_token=job.cancel_token
+                )
+            if response['success']:
+                job.result = response['result']
+                job.status = 'succeeded'
+            else:
+                job.error = response['error']
+                job.status = 'cancelled' if response.get('cancelled') else 'failed'
+            job.duration = response.get('duration')
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            self._finish(job)
+
+    def _finish(self, job):
+        """记录任务结束"""
+        job.finished_at = datetime.utcnow()
+        with self._lock:
+            self._outstanding -= 1
+            self._finished[job.id] = time.monotonic()
+
+    def _purge(self):
+        """清理超过保留时间的已完成任务（需持有锁）"""
+        deadline = time.monotonic() - self.result_ttl
+        expired = [job_id for job_id, finished in self._finished.items() if finished < deadline]
+        for job_id in expired:
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+    def shutdown(self, wait=True):
+        """
+        关闭线程池
+
+        Args:
+            wait: 是否等待执行中的任务完成
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+
+# 全局任务管理器
+job_manager = JobManager()
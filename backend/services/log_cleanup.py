@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import uuid
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from backend.config import Config
+from backend.models.log import Log, LogPartition
+from backend.models.db import db
+from backend.services.job_service import CancelToken
+from backend.services.log_partitions import log_partitions
+
+
+class LogCleanupJob:
+    """日志清除任务"""
+
+    def __init__(self, criteria, filters=None, models=None, drop_before=None):
+        """
+        初始化清除任务
+
+        Args:
+            criteria: 接收日志映射类、返回过滤条件（SQLAlchemy表达式列表）的函数
+            filters: 原始过滤参数，用于展示
+            models: 要清除的日志映射类列表（热分区和归档分区），默认只清除Log
+            drop_before: 所有日志都早于该时间的归档分区整表删除，不逐批删除；为None时不删除分区
+        """
+        self.id = uuid.uuid4().hex
+        self.criteria = criteria
+        self.models = models or [Log]
+        self.drop_before = drop_before
+        self.filters = filters or {}
+        self.cancel_token = CancelToken()
+        self.status = 'pending'
+        self.deleted = 0
+        self.batches = 0
+        self.dropped_partitions = []
+        self.dropped_logs = 0
+        self.progress = 0.0
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        """任务是否已结束"""
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'filters': self.filters,
+            'deleted': self.deleted,
+            'batches': self.batches,
+            'dropped_partitions': self.dropped_partitions,
+            'dropped_logs': self.dropped_logs,
+            'progress': round(self.progress, 4),
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class LogCleanupManager:
+    """
+    日志清除任务管理器
+
+    按主键区间分批删除，每批一个短事务，批次之间短暂让出数据库，
+    不会长时间锁住日志表。任务在后台单线程中依次执行，提交后立即返回任务ID。
+    任务状态保存在当前进程的内存中，与异步调用任务一样要求单个工作进程运行；
+    进程重启后未完成的任务中止，已删除的日志不会恢复，重新提交即可继续清除。
+    """
+
+    def __init__(self, result_ttl=None):
+        """
+        初始化任务管理器
+
+        Args:
+            result_ttl: 已完成任务的保留秒数
+        """
+        self.result_ttl = result_ttl or Config.JOB_RESULT_TTL
+        self._executor = None
+        self._jobs = {}
+        self._finished = {}
+        self._lock = threading.Lock()
+
+    def submit(self, app, criteria, filters=None, models=None, drop_before=None):
+        """
+        提交清除任务
+
+        Args:
+            app: Flask应用实例，任务线程在其应用上下文中执行
+            criteria: 接收日志映射类、返回过滤条件（SQLAlchemy表达式列表）的函数
+            filters: 原始过滤参数
+            models: 要清除的日志映射类列表
+            drop_before: 整表删除所有日志都早于该时间的归档分区
+
+        Returns:
+            LogCleanupJob实例
+        """
+        job = LogCleanupJob(criteria, filters, models, drop_before)
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-cleanup')
+            executor = self._executor
+
+        executor.submit(self._run, app, job)
+        return job
+
+    def get(self, job_id):
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            LogCleanupJob实例，不存在返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        取消任务，已删除的批次不会恢复
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            LogCleanupJob实例，不存在返回None
+        """
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_token.cancel()
+        return job
+
+    def _run(self, app, job):
+        """在后台线程中执行任务"""
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        try:
+            with app.app_context():
+                try:
+                    self.delete_in_batches(job)
+                except Exception:
+                    db.session.rollback()
+                    raise
+            job.status = 'cancelled' if job.cancel_token.cancelled else 'succeeded'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                self._finished[job.id] = time.monotonic()
+
+    @classmethod
+    def delete_in_batches(cls, job, batch_size=None):
+        """
+        依次清除各分区中符合条件的日志，进度按分区数平均分配
+
+        整个早于drop_before的归档分区直接删除整表，其余分区按主键区间分批删除。
+
+        Args:
+            job: 清除任务
+            batch_size: 每批删除的条数
+        """
+        total = len(job.models)
+        for index, model in enumerate(job.models):
+            if job.cancel_token.cancelled:
+                return
+            if cls._drop_partition(job, model):
+                job.progress = (index + 1) / total
+                continue
+            cls._delete_model(job, model, batch_size, index / total, 1 / total)
+
+        if not job.cancel_token.cancelled:
+            job.progress = 1.0
+
+    @staticmethod
+    def _drop_partition(job, model):
+        """
+        归档分区的日志都早于drop_before时删除整个分区
+
+        Args:
+            job: 清除任务
+            model: 日志映射类
+
+        Returns:
+            已按分区处理返回True，需要分批删除返回False
+        """
+        end = getattr(model, 'partition_end', None)
+        if job.drop_before is None or end is None or end >= job.drop_before:
+            return False
+
+        name = model.__tablename__
+        partition = LogPartition.query.filter_by(name=name).first()
+        # 分区可能已被保留期限清理删除
+        if partition is not None:
+            rows = log_partitions.drop(partition)
+            job.dropped_partitions.append(name)
+            job.dropped_logs += rows
+        return True
+
+    @staticmethod
+    def _delete_model(job, model, batch_size, base, share):
+        """
+        按主键区间分批删除一个分区中符合条件的日志
+
+        只处理任务开始时已存在的日志（ID不超过当时的最大ID），
+        进度按已扫描的主键区间估算，不需要COUNT(*)。
+
+        Args:
+            job: 清除任务
+            model: 日志映射类
+            batch_size: 每批删除的条数
+            base: 该分区开始时的任务进度
+            share: 该分区占任务进度的比例
+        """
+        batch_size = batch_size or Config.LOG_DELETE_BATCH_SIZE
+        criteria = job.criteria(model)
+        low, high = db.session.query(func.min(model.id), func.max(model.id)).filter(*criteria).one()
+        db.session.commit()
+        if low is None:
+            job.progress = base + share
+            return
+
+        last_id = low - 1
+        while not job.cancel_token.cancelled:
+            # 取下一批的主键上界，按主键区间删除
+            ids = [row[0] for row in db.session.query(model.id).filter(
+                *criteria, model.id > last_id, model.id <= high
+            ).order_by(model.id).limit(batch_size)]
+            if not ids:
+                break
+
+            deleted = db.session.query(model).filter(
+                *criteria, model.id > last_id, model.id <= ids[-1]
+            ).delete(synchronize_session=False)
+            log_partitions.discount(model, deleted)
+            db.session.commit()
+
+            last_id = ids[-1]
+            job.deleted += deleted
+            job.batches += 1
+            job.progress = base + share * (last_id - low + 1) / (high - low + 1)
+
+            # 批次之间让出数据库，其他请求可以获得写锁
+            if Config.LOG_DELETE_PAUSE > 0:
+                time.sleep(Config.LOG_DELETE_PAUSE)
+
+    def _purge(self):
+        """清理超过保留时间的已完成任务（需持有锁）"""
+        deadline = time.monotonic() - self.result_ttl
+        expired = [job_id for job_id, finished in self._finished.items() if finished < deadline]
+        for job_id in expired:
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+
+# 全局日志清除任务管理器
+log_cleanup = LogCleanupManager()
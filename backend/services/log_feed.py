@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import uuid
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from backend.config import Config
+from backend.models.log import decode_payload
+
+
+class LogEvent:
+    """实时日志事件，序列化结果在首次发送时生成并由所有订阅者共用"""
+
+    __slots__ = ('id', 'seq', 'row', '_data')
+
+    def __init__(self, event_id, seq, row):
+        self.id = event_id
+        self.seq = seq
+        self.row = row
+        self._data = None
+
+    @property
+    def data(self):
+        """事件数据（JSON字符串），params和result解码为对象"""
+        if self._data is None:
+            payload = dict(self.row)
+            for key in ('params', 'result'):
+                payload[key] = decode_payload(payload.get(key))
+            self._data = json.dumps(payload, ensure_ascii=False, default=self._serialize)
+        return self._data
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+
+class LogSubscription:
+    """一个实时日志订阅，按级别和工具过滤"""
+
+    def __init__(self, level=None, tool_id=None):
+        """
+        初始化订阅
+
+        Args:
+            level: 只接收该级别的日志
+            tool_id: 只接收该工具的日志
+        """
+        self.level = level
+        self.tool_id = tool_id
+        self.queue = queue.Queue(maxsize=Config.LOG_STREAM_QUEUE_SIZE)
+        # 重连时补发的事件
+        self.replay = []
+        # Last-Event-ID已超出缓冲范围，可能漏收了日志
+        self.gap = False
+        # 因队列已满而丢弃的事件数
+        self.dropped = 0
+
+    def matches(self, row):
+        """日志是否符合订阅条件"""
+        if self.level and row.get('level') != self.level:
+            return False
+        if self.tool_id and row.get('tool_id') != self.tool_id:
+            return False
+        return True
+
+    def offer(self, event):
+        """放入事件，客户端读取过慢、队列已满时丢弃并计数"""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogFeed:
+    """
+    实时日志分发
+
+    日志写入器每写入一批日志就发布到这里，再分发给各个订阅者的队列，
+    所有客户端共用同一份数据，不需要各自轮询数据库。
+    最近LOG_STREAM_BUFFER条事件保留在内存中，客户端带Last-Event-ID重连时补发。
+    只能看到本进程写入的日志。
+    """
+
+    def __init__(self):
+        # 事件ID前缀，进程重启后旧的Last-Event-ID不会误匹配
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer = deque(maxlen=Config.LOG_STREAM_BUFFER)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, rows):
+        """
+        发布已写入的日志
+
+        Args:
+            rows: 日志行字典列表
+        """
+        with self._lock:
+            for row in rows:
+                self._seq += 1
+                event = LogEvent(f"{self.epoch}-{self._seq}", self._seq, row)
+                self._buffer.append(event)
+                for subscription in self._subscribers:
+                    if subscription.matches(row):
+                        subscription.offer(event)
+
+    def subscribe(self, level=None, tool_id=None, last_event_id=None):
+        """
+        订阅实时日志
+
+        Args:
+            level: 只接收该级别的日志
+            tool_id: 只接收该工具的日志
+            last_event_id: 客户端最后收到的事件ID，用于补发断线期间的日志
+
+        Returns:
+            LogSubscription实例，订阅数已达LOG_STREAM_MAX_CLIENTS时返回None
+        """
+        subscription = LogSubscription(level, tool_id)
+        with self._lock:
+            if len(self._subscribers) >= Config.LOG_STREAM_MAX_CLIENTS:
+                return None
+
+            if last_event_id:
+                seq = self._parse_event_id(last_event_id)
+                oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+                if seq is None or seq > self._seq or seq < oldest - 1:
+                    subscription.gap = True
+                else:
+                    subscription.replay = [
+                        event for event in self._buffer
+                        if event.seq > seq and subscription.matches(event.row)
+                    ]
+
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        取消订阅
+
+        Args:
+            subscription: LogSubscription实例
+        """
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _parse_event_id(self, event_id):
+        """解析事件ID，不是本进程生成的返回None"""
+        epoch, _, seq = event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def stats(self):
+        """分发统计信息"""
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self._seq,
+                'buffered': len(self._buffer)
+            }
+
+
+# 全局实时日志分发
+log_feed = LogFeed()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import Table, Column, func, select, insert, update, delete, text
+from sqlalchemy.orm import registry
+from sqlalchemy.schema import CreateTable
+from backend.config import Config
+from backend.models.log import Log, LogMixin, LogPartition
+from backend.models.db import db
+from backend.services.log_search import log_search
+from backend.services.log_sampler import log_sampler
+
+# 分区周期
+PARTITION_PERIODS = [
+    'none',          # 不分区
+    'day',           # 按天
+    'month'          # 按月
+]
+
+
+class LogPartitionManager:
+    """
+    日志时间分区管理器
+
+    logs表只保存当前周期的日志（热分区）。进入新周期后，整张logs表改名为归档表
+    （如logs_p202610）并新建空的logs表，改名只修改表结构元数据，不搬移数据。
+    归档表登记在log_partitions目录中（时间范围、ID范围），查询只访问与日期范围重叠的分区，
+    保留期限到期时直接删除整张归档表，不需要逐行DELETE。
+
+    SQLite和MySQL都采用表轮转（MySQL原生分区要求主键包含分区列，且不支持外键和全文索引）。
+    """
+
+    def __init__(self):
+        self.app = None
+        # 归档表名 -> 映射类
+        self._models = {}
+        self._registry = registry()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def enabled(self):
+        """是否开启分区轮转"""
+        return Config.LOG_PARTITION_PERIOD in ('day', 'month')
+
+    def init_app(self, app):
+        """
+        绑定Flask应用并启动轮转线程
+
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        if self.enabled and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        """启动轮转线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='log-partitions', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止轮转线程"""
+        self._stopping.set()
+
+    def _run(self):
+        """轮转循环：先轮转热分区，再删除超过保留期限的归档分区"""
+        while True:
+            try:
+                with self.app.app_context():
+                    self.rotate()
+                    self.apply_retention()
+            except Exception as e:
+                self.app.logger.error("日志分区维护失败: %s", e, exc_info=True)
+            if self._stopping.wait(Config.LOG_PARTITION_CHECK_INTERVAL):
+                break
+
+    @staticmethod
+    def period_start(moment):
+        """
+        计算时间所在周期的开始时间
+
+        Args:
+            moment: 时间
+
+        Returns:
+            周期开始时间
+        """
+        if Config.LOG_PARTITION_PERIOD == 'day':
+            return datetime(moment.year, moment.month, moment.day)
+        return datetime(moment.year, moment.month, 1)
+
+    @staticmethod
+    def period_key(moment):
+        """周期标识，用于归档表名"""
+        if Config.LOG_PARTITION_PERIOD == 'day':
+            return moment.strftime('%Y%m%d')
+        return moment.strftime('%Y%m')
+
+    def partitions(self):
+        """
+        获取所有归档分区（最新的在前）
+
+        Returns:
+            LogPartition列表
+        """
+        return LogPartition.query.order_by(LogPartition.end_at.desc(), LogPartition.id.desc()).all()
+
+    def model(self, partition):
+        """
+        获取归档表的映射类，字段与方法与Log相同
+
+        Args:
+            partition: LogPartition实例
+
+        Returns:
+            映射类，带有partition_start和partition_end属性
+        """
+        with self._lock:
+            model = self._models.get(partition.name)
+            if model is None:
+                # 只复制列定义，不带外键（归档分区不参与级联删除）
+                table = Table(partition.name, self._registry.metadata, *[
+                    Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                    for column in Log.__table__.columns
+                ])
+                model = type(f"ArchivedLog_{partition.name}", (LogMixin,), {'__tablename__': partition.name})
+                self._registry.map_imperatively(model, table)
+                model.__table__ = table
+                self._models[partition.name] = model
+        model.partition_start = partition.start_at
+        model.partition_end = partition.end_at
+        model.partition_min_id = partition.min_id
+        model.partition_max_id = partition.max_id
+        return model
+
+    def models(self, start=None, end=None):
+        """
+        获取与时间范围重叠的日志映射类：热分区Log在前，归档分区按时间倒序
+
+        Args:
+            start: 开始时间，为None时不限
+            end: 结束时间，为None时不限
+
+        Returns:
+            映射类列表
+        """
+        models = [Log]
+        for partition in self.partitions():
+            if start is not None and partition.end_at is not None and partition.end_at < start:
+                continue
+            if end is not None and partition.start_at is not None and partition.start_at > end:
+                continue
+            models.append(self.model(partition))
+        return models
+
+    def find(self, log_id):
+        """
+        按ID查找日志，按ID范围定位分区
+
+        Args:
+            log_id: 日志ID
+
+        Returns:
+            日志实例，不存在返回None
+        """
+        log = db.session.get(Log, log_id)
+        if log is not None:
+            return log
+        for model in self.models()[1:]:
+            if model.partition_min_id is not None and model.partition_min_id <= log_id <= model.partition_max_id:
+                log = db.session.get(model, log_id)
+                if log is not None:
+                    return log
+        return None
+
+    @staticmethod
+    def newest(build_query, limit, models):
+        """
+        跨分区取最新的若干条日志
+
+        依次查询各分区并归并，已取够且下一个分区的最晚时间早于已取到的第limit条时停止，
+        通常只访问热分区和最近的一个归档分区。
+
+        Args:
+            build_query: 接收映射类、返回已过滤查询的函数
+            limit: 条数
+            models: 映射类列表（热分区在前，归档分区按时间倒序）
+
+        Returns:
+            按 (created_at, id) 倒序排列的日志列表
+        """
+        logs = []
+        for model in models:
+            end = getattr(model, 'partition_end', None)
+            if len(logs) >= limit and end is not None and end < logs[limit - 1].created_at:
+                break
+            query = build_query(model).order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+            logs.extend(query.all())
+            logs.sort(key=lambda log: (log.created_at, log.id), reverse=True)
+            del logs[limit:]
+        return logs
+
+    @contextmanager
+    def _transaction(self):
+        """
+        开启写事务；SQLite下使用BEGIN IMMEDIATE，使表结构变更在同一事务中原子完成
+
+        Yields:
+            数据库连接
+        """
+        with db.engine.connect() as conn:
+            if conn.dialect.name == 'sqlite':
+                conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def rotate(self, now=None):
+        """
+        热分区中有早于当前周期的日志时，把logs表轮转为归档表
+
+        进入新周期LOG_PARTITION_GRACE秒后才轮转，避免刚写入的上一周期日志单独形成很小的分区。
+
+        Args:
+            now: 当前时间，默认为datetime.utcnow()
+
+        Returns:
+            新建的LogPartition，无需轮转时返回None
+        """
+        if not self.enabled:
+            return None
+
+        now = now or datetime.utcnow()
+        boundary = self.period_start(now)
+        if now < boundary + timedelta(seconds=Config.LOG_PARTITION_GRACE):
+            return None
+
+        dialect = db.engine.dialect.name
+        if dialect not in ('sqlite', 'mysql'):
+            return None
+
+        # 先用索引判断是否需要轮转，避免无谓地获取写锁
+        oldest = db.session.query(func.min(Log.created_at)).scalar()
+        db.session.commit()
+        if oldest is None or oldest >= boundary:
+            return None
+
+        # 条数在写锁外统计；持锁后只补计此后写入的少量日志（按主键区间）
+        counted_max_id = db.session.query(func.max(Log.id)).scalar() or 0
+        counted = db.session.query(func.count(Log.id)).filter(Log.id <= counted_max_id).scalar()
+        db.session.commit()
+
+        table = Log.__table__
+        with self._transaction() as conn:
+            if dialect == 'mysql' and not conn.execute(text("SELECT GET_LOCK('log_partition_rotate', 0)")).scalar():
+                return None
+            try:
+                # 获得锁后重新检查，其他工作进程可能已完成轮转；
+                # 上下界分别查询，每个MIN/MAX都只读索引的一端
+                start_at = conn.execute(select(func.min(table.c.created_at))).scalar()
+                if start_at is None or start_at >= boundary:
+                    return None
+                end_at = conn.execute(select(func.max(table.c.created_at))).scalar()
+                min_id = conn.execute(select(func.min(table.c.id))).scalar()
+                max_id = conn.execute(select(func.max(table.c.id))).scalar()
+                row_count = counted + conn.execute(
+                    select(func.count()).select_from(table).where(table.c.id > counted_max_id)
+                ).scalar()
+
+                name = self._archive_name(conn, start_at)
+                if dialect == 'sqlite':
+                    self._rotate_sqlite(conn, name, max_id, self.period_key(boundary))
+                else:
+                    self._rotate_mysql(conn, name, max_id)
+
+                conn.execute(insert(LogPartition.__table__).values(
+                    name=name, start_at=start_at, end_at=end_at,
+                    min_id=min_id, max_id=max_id, row_count=row_count,
+                    created_at=now, updated_at=now
+                ))
+            finally:
+                if dialect == 'mysql':
+                    conn.execute(text("SELECT RELEASE_LOCK('log_partition_rotate')"))
+
+        return LogPartition.query.filter_by(name=name).first()
+
+    def _archive_name(self, conn, oldest):
+        """生成未被占用的归档表名"""
+        base = f"logs_p{self.period_key(oldest)}"
+        existing = {row[0] for row in conn.execute(
+            select(LogPartition.__table__.c.name).where(LogPartition.__table__.c.name.like(f"{base}%"))
+        )}
+        name, suffix = base, 1
+        while name in existing:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        return name
+
+    @staticmethod
+    def _rotate_sqlite(conn, name, max_id, period_key):
+        """
+        SQLite：改名后新建空的logs表
+
+        SQLite的索引名全库唯一。归档表原有的索引随表改名保留，不重建，耗时与行数无关；
+        新表的索引使用带周期标识的名称（如ix_logs_created_at_p202611），建在空表上即时完成。
+        """
+        conn.exec_driver_sql(f"ALTER TABLE logs RENAME TO {name}")
+        log_search.archive(conn, name)
+
+        existing = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        suffix = f"p{period_key}"
+        while any(f"{index.name}_{suffix}" in existing for index in Log.__table__.indexes):
+            suffix += '_'
+
+        conn.execute(CreateTable(Log.__table__))
+        for index in Log.__table__.indexes:
+            columns = ', '.join(column.name for column in index.columns)
+            conn.exec_driver_sql(f"CREATE INDEX {index.name}_{suffix} ON logs ({columns})")
+        # 新表的ID接续归档表递增，保证日志ID全局唯一
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'logs'"))
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('logs', :seq)"), {'seq': max_id})
+        log_search.attach(conn)
+
+    @staticmethod
+    def _rotate_mysql(conn, name, max_id):
+        """MySQL：复制表结构（含全文索引）并设置自增起点，再原子地交换表名"""
+        conn.exec_driver_sql("DROP TABLE IF EXISTS logs_rotating")
+        conn.exec_driver_sql("CREATE TABLE logs_rotating LIKE logs")
+        conn.exec_driver_sql(f"ALTER TABLE logs_rotating AUTO_INCREMENT = {int(max_id) + 1}")
+        conn.exec_driver_sql(f"RENAME TABLE logs TO {name}, logs_rotating TO logs")
+
+    def drop(self, partition):
+        """
+        删除整个归档分区
+
+        Args:
+            partition: LogPartition实例
+
+        Returns:
+            删除的日志条数（分区目录中记录的条数，归档后被清除的日志已从中扣除）
+        """
+        name = partition.name
+        row_count = partition.row_count or 0
+        db.session.commit()
+        with self._transaction() as conn:
+            log_search.drop_archive(conn, name)
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(delete(LogPartition.__table__).where(LogPartition.__table__.c.name == name))
+        with self._lock:
+            self._models.pop(name, None)
+        return row_count
+
+    @staticmethod
+    def discount(model, count):
+        """
+        从归档分区目录的日志条数中扣除已删除的日志，与删除在同一事务中执行（由调用方提交）
+
+        Args:
+            model: 日志映射类，热分区Log不处理
+            count: 删除的条数
+        """
+        if model is Log or not count:
+            return
+        table = LogPartition.__table__
+        db.session.execute(
+            update(table).where(table.c.name == model.__tablename__).values(row_count=table.c.row_count - count)
+        )
+
+    def drop_before(self, cutoff):
+        """
+        删除所有日志都早于cutoff的归档分区
+
+        Args:
+            cutoff: 截止时间
+
+        Returns:
+            (删除的分区名列表, 删除的日志条数) 元组
+        """
+        dropped = []
+        rows = 0
+        for partition in self.partitions():
+            if partition.end_at is not None and partition.end_at < cutoff:
+                dropped.append(partition.name)
+                rows += self.drop(partition)
+        return dropped, rows
+
+    def apply_retention(self):
+        """
+        删除超过LOG_RETENTION_DAYS的归档分区和采样汇总
+
+        Returns:
+            删除的分区名列表
+        """
+        if Config.LOG_RETENTION_DAYS <= 0:
+            return []
+        cutoff = datetime.utcnow() - timedelta(days=Config.LOG_RETENTION_DAYS)
+        dropped, _ = self.drop_before(cutoff)
+        # 采样汇总随日志一起过期
+        log_sampler.clear(before=cutoff)
+        return dropped
+
+
+# 全局日志分区管理器
+log_partitions = LogPartitionManager()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import atexit
+import random
+import threading
+from datetime import datetime
+from sqlalchemy import insert
+from backend.config import Config
+from backend.models.log import LogSummary
+from backend.models.db import db
+
+
+class TokenBucket:
+    """令牌桶：每秒补充rate个令牌，最多累积burst个"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """
+        取一个令牌
+
+        Returns:
+            取到返回True，桶已空返回False
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class LogSampler:
+    """
+    调用日志的按工具、按级别采样
+
+    对info、debug等高频级别按比例采样（rate）并用令牌桶限制每秒写入条数（limit），
+    error级别的日志总是保留。被丢弃的日志只在内存中按 (工具, 级别) 计数，
+    后台线程每LOG_SAMPLING_FLUSH_INTERVAL秒写入一条log_summaries汇总，
+    仪表盘统计时把汇总计数加回，调用量仍然准确。
+    """
+
+    def __init__(self):
+        self.app = None
+        # (工具ID, 级别) -> TokenBucket
+        self._buckets = {}
+        # (工具ID, 级别) -> [丢弃条数, 最早时间, 最晚时间]
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        """
+        绑定Flask应用并启动汇总写入线程
+
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        if Config.LOG_SAMPLING_FLUSH_INTERVAL > 0:
+            self.start()
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """启动汇总写入线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='log-sampler', daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """停止汇总写入线程并写入剩余的计数"""
+        self._stopping.set()
+        if self.app is not None:
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                pass
+
+    @staticmethod
+    def get_settings(tool, level):
+        """
+        读取工具在某个日志级别上的采样参数
+
+        默认对LOG_SAMPLED_LEVELS中的级别使用LOG_SAMPLE_RATE、LOG_RATE_LIMIT和LOG_RATE_BURST，
+        工具配置可以按级别覆盖，示例：
+        {"log_sampling": {"info": {"rate": 0.1}, "debug": {"rate": 0.01, "limit": 5, "burst": 10}}}
+        rate为保留比例，limit为每秒最多保留的条数（0表示不限制）。
+        设置 "log_sampling": {"enabled": false} 可关闭该工具的采样。
+
+        Args:
+            tool: 工具实例
+            level: 日志级别
+
+        Returns:
+            采样参数字典，不需要采样时返回None
+        """
+        # 错误日志总是保留
+        if tool is None or level == 'error':
+            return None
+
+        overrides = tool.get_config().get('log_sampling') or {}
+        if not isinstance(overrides, dict):
+            overrides = {}
+        if overrides.get('enabled') is False:
+            return None
+
+        level_overrides = overrides.get(level)
+        if not isinstance(level_overrides, dict):
+            if level not in Config.LOG_SAMPLED_LEVELS:
+                return None
+            level_overrides = {}
+
+        defaults = {
+            'rate': Config.LOG_SAMPLE_RATE,
+            'limit': Config.LOG_RATE_LIMIT,
+            'burst': Config.LOG_RATE_BURST
+        }
+        settings = dict(defaults)
+        for key, default in defaults.items():
+            try:
+                settings[key] = type(default)(level_overrides.get(key, default))
+            except (TypeError, ValueError):
+                settings[key] = default
+
+        if settings['rate'] >= 1 and settings['limit'] <= 0:
+            return None
+        return settings
+
+    def admit(self, tool, log):
+        """
+        判断一条日志是否写入，不写入时计入汇总
+
+        Args:
+            tool: 工具实例
+            log: 未保存的日志实例
+
+        Returns:
+            需要写入返回True
+        """
+        settings = self.get_settings(tool, log.level)
+        if settings is None:
+            return True
+
+        keep = settings['rate'] >= 1 or random.random() < settings['rate']
+        if keep and settings['limit'] > 0:
+            keep = self._bucket(tool.id, log.level, settings).take()
+
+        if not keep:
+            self.record(tool.id, log.level, log.created_at or datetime.utcnow())
+        return keep
+
+    def _bucket(self, tool_id, level, settings):
+        """获取令牌桶，参数变化时重建"""
+        key = (tool_id, level)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.rate != settings['limit'] or bucket.burst != max(1.0, settings['burst']):
+                bucket = TokenBucket(settings['limit'], settings['burst'])
+                self._buckets[key] = bucket
+            return bucket
+
+    def reset(self, tool_id):
+        """
+        清除工具的令牌桶（工具变更或删除时调用）
+
+        Args:
+            tool_id: 工具ID
+        """
+        with self._lock:
+            for key in [key for key in self._buckets if key[0] == tool_id]:
+                del self._buckets[key]
+
+    def record(self, tool_id, level, sampled_at, count=1):
+        """
+        累加被丢弃的日志计数
+
+        未启动写入线程时（如脚本中直接使用服务或写入间隔设为0）立即写入，需在应用上下文中调用。
+
+        Args:
+            tool_id: 工具ID
+            level: 日志级别
+            sampled_at: 日志时间
+            count: 条数
+        """
+        key = (tool_id, level)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [count, sampled_at, sampled_at]
+            else:
+                entry[0] += count
+                entry[1] = min(entry[1], sampled_at)
+                entry[2] = max(entry[2], sampled_at)
+
+        if self._thread is None or not self._thread.is_alive():
+            self.flush()
+
+    def pending(self):
+        """
+        尚未写入数据库的丢弃条数
+
+        Returns:
+            条数
+        """
+        with self._lock:
+            return sum(entry[0] for entry in self._pending.values())
+
+    def _run(self):
+        """定时写入循环"""
+        while not self._stopping.wait(Config.LOG_SAMPLING_FLUSH_INTERVAL):
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                # 写入失败的计数已放回内存，等待下一轮
+                pass
+
+    def flush(self):
+        """
+        把累计的丢弃计数写入log_summaries，每个 (工具, 级别) 一行
+
+        Returns:
+            写入的行数
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            now = datetime.utcnow()
+            rows = [{
+                'tool_id': tool_id,
+                'level': level,
+                'sampled_out': count,
+                'window_start': start,
+                'window_end': end,
+                'created_at': now,
+                'updated_at': now
+            } for (tool_id, level), (count, start, end) in pending.items()]
+            try:
+                db.session.execute(insert(LogSummary), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                # 写入失败时放回内存，与期间新增的计数合并
+                with self._lock:
+                    for key, (count, start, end) in pending.items():
+                        entry = self._pending.get(key)
+                        if entry is None:
+                            self._pending[key] = [count, start, end]
+                        else:
+                            entry[0] += count
+                            entry[1] = min(entry[1], start)
+                            entry[2] = max(entry[2], end)
+                raise
+            return len(rows)
+
+    @staticmethod
+    def sampled_out(start=None, end=None, level=None, tool_id=None):
+        """
+        统计被丢弃的日志条数
+
+        Args:
+            start: 开始时间（按窗口开始时间计）
+            end: 结束时间
+            level: 日志级别
+            tool_id: 工具ID
+
+        Returns:
+            条数
+        """
+        query = db.session.query(db.func.coalesce(db.func.sum(LogSummary.sampled_out), 0))
+        if start is not None:
+            query = query.filter(LogSummary.window_start >= start)
+        if end is not None:
+            query = query.filter(LogSummary.window_start <= end)
+        if level:
+            query = query.filter(LogSummary.level == level)
+        if tool_id:
+            query = query.filter(LogSummary.tool_id == tool_id)
+        return query.scalar()
+
+    @staticmethod
+    def clear(before=None, level=None, tool_id=None):
+        """
+        删除采样汇总（随日志清除或保留期限一起清理）
+
+        Args:
+            before: 只删除窗口开始时间早于该时间的汇总
+            level: 日志级别
+            tool_id: 工具ID
+
+        Returns:
+            删除的行数
+        """
+        query = LogSummary.query
+        if before is not None:
+            query = query.filter(LogSummary.window_start < before)
+        if level:
+            query = query.filter(LogSummary.level == level)
+        if tool_id:
+            query = query.filter(LogSummary.tool_id == tool_id)
+        deleted = query.delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+# 全局日志采样器
+log_sampler = LogSampler()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from sqlalchemy import text, inspect, Integer, Float
+from sqlalchemy.exc import SQLAlchemyError
+from backend.models.log import Log
+from backend.models.db import db
+
+# SQLite：外部内容FTS5表，trigram分词支持中文子串匹配，由触发器与logs表保持同步
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5("
+    "message, content='logs', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN "
+    "INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE OF message ON logs BEGIN "
+    "INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message); "
+    "INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message); END",
+]
+
+SQLITE_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS logs_fts_au",
+    "DROP TRIGGER IF EXISTS logs_fts_ad",
+    "DROP TRIGGER IF EXISTS logs_fts_ai",
+    "DROP TABLE IF EXISTS logs_fts",
+]
+
+# 日志表轮转为归档表后，其FTS表随之改名，只保留删除同步触发器（归档表不再插入）
+SQLITE_ARCHIVE = [
+    "DROP TRIGGER IF EXISTS logs_fts_au",
+    "DROP TRIGGER IF EXISTS logs_fts_ad",
+    "DROP TRIGGER IF EXISTS logs_fts_ai",
+    "ALTER TABLE logs_fts RENAME TO {name}_fts",
+    "CREATE TRIGGER {name}_fts_ad AFTER DELETE ON {name} BEGIN "
+    "INSERT INTO {name}_fts({name}_fts, rowid, message) VALUES ('delete', old.id, old.message); END",
+]
+
+SQLITE_DROP_ARCHIVE = [
+    "DROP TRIGGER IF EXISTS {name}_fts_ad",
+    "DROP TABLE IF EXISTS {name}_fts",
+]
+
+# MySQL：InnoDB全文索引随增删自动维护，ngram解析器支持中文
+MYSQL_INDEX = 'ft_logs_message'
+
+# trigram分词下可走索引的最短关键词长度
+MIN_TERM_LENGTH = 3
+
+
+class LogSearch:
+    """
+    日志消息全文检索
+
+    SQLite使用FTS5（按bm25排序），MySQL使用FULLTEXT索引（按相关度排序），
+    其他数据库或全文索引不可用时退回LIKE匹配。
+    关键词按空白拆分，所有关键词都需匹配。
+    """
+
+    def __init__(self):
+        # fts5、fulltext 或 like
+        self.backend = 'like'
+
+    def init_app(self, app):
+        """
+        绑定Flask应用，确保全文索引存在
+
+        Args:
+            app: Flask应用实例
+        """
+        with app.app_context():
+            self.setup(db.engine)
+
+    def setup(self, engine):
+        """
+        创建全文索引（已存在时跳过），新建时为已有日志建立索引
+
+        Args:
+            engine: 数据库引擎
+
+        Returns:
+            使用的检索方式
+        """
+        try:
+            if engine.dialect.name == 'sqlite':
+                existed = inspect(engine).has_table('logs_fts')
+                with engine.begin() as conn:
+                    for statement in SQLITE_SETUP:
+                        conn.execute(text(statement))
+                    if not existed:
+                        conn.execute(text("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')"))
+                self.backend = 'fts5'
+            elif engine.dialect.name == 'mysql':
+                indexes = [index['name'] for index in inspect(engine).get_indexes('logs')]
+                if MYSQL_INDEX not in indexes:
+                    with engine.begin() as conn:
+                        conn.execute(text(f"ALTER TABLE logs ADD FULLTEXT INDEX {MYSQL_INDEX} (message) WITH PARSER ngram"))
+                self.backend = 'fulltext'
+            else:
+                self.backend = 'like'
+        except SQLAlchemyError:
+            # SQLite未编译FTS5或版本不支持trigram等情况，退回LIKE匹配
+            self.backend = 'like'
+        return self.backend
+
+    def teardown(self, engine):
+        """
+        删除全文索引
+
+        Args:
+            engine: 数据库引擎
+        """
+        with engine.begin() as conn:
+            if engine.dialect.name == 'sqlite':
+                for statement in SQLITE_TEARDOWN:
+                    conn.execute(text(statement))
+            elif engine.dialect.name == 'mysql':
+                indexes = [index['name'] for index in inspect(engine).get_indexes('logs')]
+                if MYSQL_INDEX in indexes:
+                    conn.execute(text(f"ALTER TABLE logs DROP INDEX {MYSQL_INDEX}"))
+        self.backend = 'like'
+
+    def archive(self, conn, name):
+        """
+        日志表轮转为归档表后，把当前的FTS表改名给归档表使用（在轮转事务中调用）
+
+        Args:
+            conn: 数据库连接
+            name: 归档表名
+        """
+        if self.backend == 'fts5':
+            for statement in SQLITE_ARCHIVE:
+                conn.execute(text(statement.format(name=name)))
+
+    def attach(self, conn):
+        """
+        为轮转后新建的空日志表建立FTS表和同步触发器（在轮转事务中调用）
+
+        Args:
+            conn: 数据库连接
+        """
+        if self.backend == 'fts5':
+            for statement in SQLITE_SETUP:
+                conn.execute(text(statement))
+
+    def drop_archive(self, conn, name):
+        """
+        删除归档表的FTS表
+
+        Args:
+            conn: 数据库连接
+            name: 归档表名
+        """
+        if conn.dialect.name == 'sqlite':
+            for statement in SQLITE_DROP_ARCHIVE:
+                conn.execute(text(statement.format(name=name)))
+
+    def apply(self, query, search, model=None):
+        """
+        为日志查询加上全文检索条件
+
+        Args:
+            query: 日志查询
+            search: 检索词
+            model: 查询的日志映射类（日志表或归档分区表），默认为Log
+
+        Returns:
+            (加上检索条件的查询, 相关度表达式) 元组，相关度越大越相关，不支持相关度时为None
+        """
+        model = model or Log
+        terms = search.split()
+        if not terms:
+            return query, None
+
+        if self.backend == 'fts5':
+            # 短于trigram长度的关键词无法走索引，改用LIKE匹配
+            indexed = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+            for term in terms:
+                if len(term) < MIN_TERM_LENGTH:
+                    query = query.filter(model.message.like(f"%{term}%"))
+            if not indexed:
+                return query, None
+
+            # 每个关键词作为短语加引号，避免被解析为FTS5查询语法
+            fts = f"{model.__tablename__}_fts"
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in indexed)
+            matches = text(
+                f"SELECT rowid AS log_id, bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH :match"
+            ).bindparams(match=match).columns(log_id=Integer, rank=Float).subquery('log_matches')
+            query = query.join(matches, matches.c.log_id == model.id)
+            # bm25越小越相关，取负数使其越大越相关
+            return query, -matches.c.rank
+
+        if self.backend == 'fulltext':
+            # 布尔模式下每个关键词都必须出现
+            against = ' '.join('+"' + term.replace('"', '') + '"' for term in terms)
+            relevance = model.message.match(against)
+            return query.filter(relevance), relevance
+
+        for term in terms:
+            query = query.filter(model.message.like(f"%{term}%"))
+        return query, None
+
+
+# 全局日志检索
+log_search = LogSearch()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from backend.config import Config
+from backend.models import log as log_model
+from backend.models.log import Log
+from backend.models.db import db
+from backend.services.log_feed import log_feed
+
+# 日志队列溢出策略
+LOG_OVERFLOW_POLICIES = [
+    'sync',          # 在调用线程中直接写入（不丢失，但调用方承担写库耗时）
+    'block',         # 最多等待LOG_ENQUEUE_TIMEOUT秒，仍满则丢弃
+    'drop'           # 立即丢弃新日志
+]
+
+
+class LogWriter:
+    """
+    调用日志的异步批量写入器
+
+    调用日志先放入有界队列，后台线程在攒够LOG_BATCH_SIZE条或等待LOG_FLUSH_INTERVAL秒后
+    用一条批量INSERT写入，请求耗时不再包含日志写库时间。
+    队列满时按LOG_OVERFLOW_POLICY处理，进程退出时写入队列中剩余的日志。
+    写入成功的日志发布到log_feed，供实时日志订阅者接收。
+    """
+
+    def __init__(self):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {'queued': 0, 'written': 0, 'sync_written': 0, 'dropped': 0, 'retried': 0, 'failed': 0}
+
+    def init_app(self, app):
+        """
+        绑定Flask应用并启动写入线程
+
+        Args:
+            app: Flask应用实例
+        """
+        self.app = app
+        if Config.LOG_PAYLOAD_COMPRESSION == 'zstd' and log_model.zstandard is None:
+            app.logger.warning('LOG_PAYLOAD_COMPRESSION=zstd 但未安装zstandard，调用参数/结果将使用zlib压缩')
+        if Config.LOG_ASYNC_ENABLED and not app.config.get('TESTING'):
+            self.start()
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """启动写入线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self):
+        """写入线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def write(self, log):
+        """
+        写入一条日志
+
+        写入线程未运行时（如未绑定应用或测试环境）直接写库，需在应用上下文中调用。
+
+        Args:
+            log: 未保存的日志实例
+        """
+        self.write_many([log])
+
+    def write_many(self, logs):
+        """
+        写入多条日志
+
+        Args:
+            logs: 未保存的日志实例列表
+        """
+        rows = [self._to_row(log) for log in logs]
+        if not rows:
+            return
+        if not self.running:
+            self._insert_sync(rows)
+            return
+
+        overflow = []
+        for row in rows:
+            if not self._enqueue(row):
+                overflow.append(row)
+
+        if overflow:
+            if Config.LOG_OVERFLOW_POLICY == 'sync':
+                self._insert_sync(overflow)
+            else:
+                self._count('dropped', len(overflow))
+
+    def write_sync(self, logs):
+        """
+        在调用线程中用一条批量INSERT写入多条日志（一个事务），不经过队列
+
+        Args:
+            logs: 未保存的日志实例列表
+
+        Returns:
+            写入的条数
+        """
+        rows = [self._to_row(log) for log in logs]
+        if rows:
+            self._insert_sync(rows)
+        return len(rows)
+
+    def _enqueue(self, row):
+        """
+        放入队列
+
+        Returns:
+            成功返回True，队列已满返回False
+        """
+        try:
+            if Config.LOG_OVERFLOW_POLICY == 'block':
+                self._queue.put(row, timeout=Config.LOG_ENQUEUE_TIMEOUT)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            return False
+        self._count('queued')
+        return True
+
+    @staticmethod
+    def _to_row(log):
+        """
+        把日志实例转换为批量INSERT的参数字典，未设置创建时间时取入队时刻
+
+        Args:
+            log: 日志实例
+
+        Returns:
+            列名到值的字典
+        """
+        now = datetime.utcnow()
+        row = {column.name: getattr(log, column.name) for column in Log.__table__.columns if column.name != 'id'}
+        row['created_at'] = row.get('created_at') or now
+        row['updated_at'] = row.get('updated_at') or row['created_at']
+        return row
+
+    def _insert_sync(self, rows):
+        """在调用线程中写入"""
+        db.session.execute(insert(Log), rows)
+        db.session.commit()
+        self._count('sync_written', len(rows))
+        log_feed.publish(rows)
+
+    def _insert(self, rows):
+        """
+        在写入线程中批量写入
+
+        数据库锁定（如日志分区轮转期间）等临时错误按LOG_WRITE_RETRIES次指数退避重试，
+        重试用完或遇到其他错误时丢弃本批并计数。
+        """
+        delay = Config.LOG_WRITE_RETRY_DELAY
+        for attempt in range(Config.LOG_WRITE_RETRIES + 1):
+            try:
+                with self.app.app_context():
+                    db.session.execute(insert(Log), rows)
+                    db.session.commit()
+                self._count('written', len(rows))
+                log_feed.publish(rows)
+                return
+            except OperationalError as e:
+                error = e
+                if attempt == Config.LOG_WRITE_RETRIES:
+                    break
+                self._count('retried')
+                time.sleep(delay)
+                delay *= 2
+            except Exception as e:
+                error = e
+                break
+        self._count('failed', len(rows))
+        self.app.logger.error("日志批量写入失败（%d条）: %s", len(rows), error, exc_info=error)
+
+    def _run(self):
+        """写入循环：攒批后写入，停止时写完队列中的剩余日志"""
+        while True:
+            batch = self._collect()
+            if batch:
+                self._insert(batch)
+                for _ in batch:
+                    self._queue.task_done()
+            elif self._stopping.is_set():
+                break
+
+    def _collect(self):
+        """
+        从队列中收集一批日志
+
+        Returns:
+            日志行列表，等待超时且队列为空时返回空列表
+        """
+        try:
+            batch = [self._queue.get(timeout=Config.LOG_FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + Config.LOG_FLUSH_INTERVAL
+        while len(batch) < Config.LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                if self._stopping.is_set() or remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, timeout=None):
+        """
+        等待已入队的日志全部写入完成
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            队列已清空返回True
+        """
+        if self._queue is None:
+            return True
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.LOG_SHUTDOWN_TIMEOUT)
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not (self._thread and self._thread.is_alive()):
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self):
+        """停止写入线程，写入队列中剩余的日志"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(Config.LOG_SHUTDOWN_TIMEOUT)
+
+        # 写入线程未能及时写完时，在当前线程写入剩余日志
+        rows = []
+        while self._queue is not None:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if rows and self.app is not None:
+            self._insert(rows)
+        for _ in rows:
+            self._queue.task_done()
+
+    def _count(self, key, count=1):
+        """累加统计计数"""
+        with self._lock:
+            self._stats[key] += count
+
+    def stats(self):
+        """写入器统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        stats['running'] = self.running
+        stats['overflow_policy'] = Config.LOG_OVERFLOW_POLICY
+        return stats
+
+
+# 全局日志写入器
+log_writer = LogWriter()
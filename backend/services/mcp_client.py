@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import threading
+import itertools
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# JSON-RPC错误码：方法不存在
+METHOD_NOT_FOUND = -32601
+
+
+class MCPError(Exception):
+    """MCP调用异常（工具返回的JSON-RPC错误）"""
+
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class MCPConnectionClosed(MCPError):
+    """与工具进程的连接已关闭"""
+    pass
+
+
+class MCPTimeoutError(MCPError):
+    """等待工具响应超时"""
+    pass
+
+
+class MCPClient:
+    """
+    多路复用的MCP stdio JSON-RPC客户端
+
+    同一条管道上可以同时存在多个未完成的请求：写入由锁串行化，
+    后台读线程按响应中的id把结果分发给对应的调用方，
+    调用方之间不会因为某个慢请求而互相等待。
+    """
+
+    def __init__(self, reader, writer, name='mcp'):
+        """
+        初始化客户端
+
+        Args:
+            reader: 工具进程的标准输出（文本模式）
+            writer: 工具进程的标准输入（文本模式）
+            name: 客户端名称，用于读线程命名
+        """
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._notification_handlers = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._read_loop, name=f"{name}-reader", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        """连接是否已关闭"""
+        return self._closed
+
+    @property
+    def in_flight(self):
+        """未完成的请求数量"""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def add_notification_handler(self, handler):
+        """
+        注册通知处理函数
+
+        Args:
+            handler: 回调函数，参数为 (method, params)
+        """
+        self._notification_handlers.append(handler)
+
+    def remove_notification_handler(self, handler):
+        """
+        移除通知处理函数
+
+        Args:
+            handler: 已注册的回调函数
+        """
+        try:
+            self._notification_handlers.remove(handler)
+        except ValueError:
+            pass
+
+    def _write(self, message):
+        """写入一条消息"""
+        if self._closed:
+            raise MCPConnectionClosed('工具进程连接已关闭')
+        data = json.dumps(message, ensure_ascii=False) + '\n'
+        try:
+            with self._write_lock:
+                self._writer.write(data)
+                self._writer.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise MCPConnectionClosed(f"写入工具进程失败: {str(e)}")
+
+    def notify(self, method, params=None):
+        """
+        发送通知（无需响应）
+
+        Args:
+            method: 方法名
+            params: 参数
+        """
+        message = {'jsonrpc': '2.0', 'method': method}
+        if params is not None:
+            message['params'] = params
+        self._write(message)
+
+    def send_request(self, method, params=None):
+        """
+        发送请求，不等待响应
+
+        Args:
+            method: 方法名
+            params: 参数
+
+        Returns:
+            (请求ID, Future) 元组，Future在收到响应后完成
+        """
+        request_id = next(self._ids)
+        future = Future()
+        with self._pending_lock:
+            if self._closed:
+                raise MCPConnectionClosed('工具进程连接已关闭')
+            self._pending[request_id] = future
+
+        message = {'jsonrpc': '2.0', 'id': request_id, 'method': method}
+        if params is not None:
+            message['params'] = params
+        try:
+            self._write(message)
+        except MCPError:
+            self._discard(request_id)
+            raise
+        return request_id, future
+
+    def request(self, method, params=None, timeout=None):
+        """
+        发送请求并等待响应
+
+        Args:
+            method: 方法名
+            params: 参数
+            timeout: 超时秒数，None表示一直等待
+
+        Returns:
+            响应中的result字段
+        """
+        request_id, future = self.send_request(method, params)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.cancel(request_id, '请求超时')
+            raise MCPTimeoutError(f"等待工具响应超时（{timeout}秒）")
+
+    def cancel(self, request_id, reason=None):
+        """
+        取消未完成的请求，并通知工具停止处理
+
+        Args:
+            request_id: 请求ID
+            reason: 取消原因
+        """
+        future = self._discard(request_id)
+        if future is None:
+            return
+        future.cancel()
+        try:
+            self.notify('notifications/cancelled', {'requestId': request_id, 'reason': reason})
+        except MCPError:
+            pass
+
+    def _discard(self, request_id):
+        """移除未完成的请求"""
+        with self._pending_lock:
+            return self._pending.pop(request_id, None)
+
+    def _read_loop(self):
+        """后台读线程：逐行读取消息并分发"""
+        try:
+            for line in self._reader:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    # 忽略非JSON输出
+                    continue
+                if isinstance(message, dict):
+                    self._dispatch(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._close_pending()
+
+    def _dispatch(self, message):
+        """按消息类型分发：响应、通知或工具发起的请求"""
+        if 'method' not in message:
+            future = self._discard(message.get('id'))
+            if future is None or future.done():
+                return
+            if 'error' in message:
+                error = message['error'] or {}
+                future.set_exception(MCPError(
+                    error.get('message', '工具返回错误'),
+                    code=error.get('code'),
+                    data=error.get('data')
+                ))
+            else:
+                future.set_result(message.get('result'))
+        elif 'id' in message:
+            self._handle_server_request(message)
+        else:
+            for handler in list(self._notification_handlers):
+                try:
+                    handler(message['method'], message.get('params') or {})
+                except Exception:
+                    pass
+
+    def _handle_server_request(self, message):
+        """响应工具发起的请求（仅支持ping）"""
+        if message['method'] == 'ping':
+            response = {'jsonrpc': '2.0', 'id': message['id'], 'result': {}}
+        else:
+            response = {
+                'jsonrpc': '2.0',
+                'id': message['id'],
+                'error': {'code': METHOD_NOT_FOUND, 'message': f"不支持的方法: {message['method']}"}
+            }
+        try:
+            self._write(response)
+        except MCPError:
+            pass
+
+    def _close_pending(self):
+        """连接关闭时让所有未完成的请求失败"""
+        with self._pending_lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(MCPConnectionClosed('工具进程已退出'))
+
+    def join(self, timeout=None):
+        """
+        等待读线程结束
+
+        Args:
+            timeout: 超时秒数
+        """
+        self._thread.join(timeout)
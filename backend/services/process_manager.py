@@ -0,0 +1,694 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shlex
+import signal
+import atexit
+import time
+import subprocess
+import threading
+from backend.config import Config
+from backend.services.mcp_client import MCPClient, MCPTimeoutError
+
+# MCP协议版本
+MCP_PROTOCOL_VERSION = '2024-11-05'
+
+# 客户端信息，在initialize握手时发送给工具
+CLIENT_INFO = {'name': 'mcp-platform', 'version': '1.0.0'}
+
+
+class ToolProcessError(Exception):
+    """工具进程异常（启动失败、进程退出、协议错误等）"""
+    pass
+
+
+class ToolTimeoutError(ToolProcessError):
+    """工具调用超时"""
+    pass
+
+
+class ToolCancelledError(ToolProcessError):
+    """工具调用已取消"""
+    pass
+
+
+class ToolProcess:
+    """
+    常驻的MCP stdio工具进程
+
+    进程启动后通过标准输入输出收发以换行分隔的JSON-RPC消息，
+    完成initialize握手后即可被多次调用，避免每次调用都重新启动进程。
+    消息收发由MCPClient负责，同一进程上可以并发执行多个请求。
+    """
+
+    def __init__(self, tool_id, command, args=None, env=None, cwd=None):
+        """
+        初始化工具进程
+
+        Args:
+            tool_id: 工具ID
+            command: 工具命令
+            args: 附加命令行参数列表
+            env: 附加环境变量字典
+            cwd: 工作目录
+        """
+        self.tool_id = tool_id
+        self.argv = shlex.split(command) + [str(arg) for arg in (args or [])]
+        self.env = env or {}
+        self.cwd = cwd
+        self.process = None
+        self.client = None
+        self.server_info = {}
+        self.last_used = time.monotonic()
+        self._stderr = None
+
+    @classmethod
+    def from_tool(cls, tool):
+        """
+        根据工具模型创建进程实例
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            ToolProcess实例
+        """
+        return cls(tool.id, **cls.spec_from_tool(tool))
+
+    @staticmethod
+    def spec_from_tool(tool):
+        """
+        从工具模型提取进程启动参数
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            可传给构造函数的参数字典
+        """
+        if not tool.command:
+            raise ToolProcessError(f"工具 '{tool.name}' 未配置启动命令")
+
+        config = tool.get_config()
+        return {
+            'command': tool.command,
+            'args': config.get('args'),
+            'env': config.get('env'),
+            'cwd': config.get('cwd')
+        }
+
+    @property
+    def pid(self):
+        """进程ID"""
+        return self.process.pid if self.process else None
+
+    @property
+    def in_flight(self):
+        """进行中的请求数"""
+        return self.client.in_flight if self.client else 0
+
+    def idle_seconds(self):
+        """空闲秒数（没有进行中的请求时自最后一次使用起计算）"""
+        if self.in_flight:
+            return 0.0
+        return time.monotonic() - self.last_used
+
+    def is_alive(self):
+        """进程是否仍在运行"""
+        return (
+            self.process is not None
+            and self.process.poll() is None
+            and self.client is not None
+            and not self.client.closed
+        )
+
+    def start(self):
+        """启动进程并完成MCP initialize握手"""
+        env = dict(os.environ)
+        env.update({key: str(value) for key, value in self.env.items()})
+
+        # 工具的标准错误输出写入日志目录，避免管道写满阻塞进程
+        try:
+            os.makedirs(Config.LOG_DIR, exist_ok=True)
+            self._stderr = open(os.path.join(Config.LOG_DIR, f"tool_{self.tool_id}.stderr.log"), 'a')
+        except OSError:
+            self._stderr = subprocess.DEVNULL
+
+        try:
+            self.process = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._stderr,
+                cwd=self.cwd,
+                env=env,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+                # 独立进程组，停止时可以连同子进程一起终止
+                start_new_session=(os.name == 'posix')
+            )
+        except OSError as e:
+            self._close_stderr()
+            raise ToolProcessError(f"无法启动进程: {str(e)}")
+
+        self.client = MCPClient(self.process.stdout, self.process.stdin, name=f"tool-{self.tool_id}")
+
+        try:
+            result = self.request('initialize', {
+                'protocolVersion': MCP_PROTOCOL_VERSION,
+                'capabilities': {},
+                'clientInfo': CLIENT_INFO
+            }, timeout=Config.TOOL_START_TIMEOUT)
+            self.server_info = result.get('serverInfo', {}) if isinstance(result, dict) else {}
+            self.notify('notifications/initialized')
+        except Exception:
+            self.stop()
+            raise
+
+        return self
+
+    def notify(self, method, params=None):
+        """
+        发送通知（无需响应）
+
+        Args:
+            method: 方法名
+            params: 参数
+        """
+        self.client.notify(method, params)
+
+    def request(self, method, params=None, timeout=None):
+        """
+        发送请求并等待响应，可与其他请求并发执行
+
+        Args:
+            method: 方法名
+            params: 参数
+            timeout: 超时秒数
+
+        Returns:
+            响应中的result字段
+        """
+        if self.client is None:
+            raise ToolProcessError('工具进程未运行')
+        self.last_used = time.monotonic()
+        try:
+            return self.client.request(method, params, timeout=timeout)
+        finally:
+            self.last_used = time.monotonic()
+
+    def call_tool(self, name, arguments=None, timeout=None):
+        """
+        调用MCP工具（tools/call）
+
+        Args:
+            name: MCP工具名称
+            arguments: 调用参数
+            timeout: 超时秒数
+
+        Returns:
+            调用结果
+        """
+        return self.request('tools/call', {'name': name, 'arguments': arguments or {}}, timeout=timeout)
+
+    def start_call(self, name, arguments=None, progress_token=None):
+        """
+        发起MCP工具调用但不等待结果，用于流式返回进度
+
+        Args:
+            name: MCP工具名称
+            arguments: 调用参数
+            progress_token: 进度令牌，工具据此发送notifications/progress
+
+        Returns:
+            (请求ID, Future) 元组
+        """
+        if self.client is None:
+            raise ToolProcessError('工具进程未运行')
+        params = {'name': name, 'arguments': arguments or {}}
+        if progress_token is not None:
+            params['_meta'] = {'progressToken': progress_token}
+        self.last_used = time.monotonic()
+        request_id, future = self.client.send_request('tools/call', params)
+        future.add_done_callback(self._touch)
+        return request_id, future
+
+    def _touch(self, _=None):
+        """更新最后使用时间"""
+        self.last_used = time.monotonic()
+
+    def stop(self, timeout=5):
+        """
+        停止进程
+
+        Args:
+            timeout: 等待进程退出的秒数，超时后强制结束
+        """
+        process = self.process
+        if process is None:
+            return
+
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            self._signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._signal(signal.SIGKILL if hasattr(signal, 'SIGKILL') else signal.SIGTERM)
+                process.wait()
+
+        if self.client:
+            self.client.join(timeout=1)
+        if process.stdout:
+            process.stdout.close()
+        self._close_stderr()
+
+    def _signal(self, sig):
+        """向进程组发送信号"""
+        try:
+            if os.name == 'posix':
+                os.killpg(self.process.pid, sig)
+            else:
+                self.process.terminate()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _close_stderr(self):
+        """关闭标准错误日志文件"""
+        if self._stderr not in (None, subprocess.DEVNULL):
+            self._stderr.close()
+        self._stderr = None
+
+
+class ToolPool:
+    """
+    单个工具的预热进程池
+
+    激活时预先启动min_processes个进程，调用时选择进行中请求最少的进程；
+    所有进程的进行中请求都达到max_inflight时扩容，最多max_processes个；
+    空闲超过idle_timeout的多余进程由后台回收线程停止，直到只剩min_processes个。
+    """
+
+    def __init__(self, tool_id, spec, limits):
+        """
+        初始化进程池
+
+        Args:
+            tool_id: 工具ID
+            spec: 进程启动参数（ToolProcess.spec_from_tool的返回值）
+            limits: (最少进程数, 最多进程数, 空闲回收秒数, 单进程最大并发请求数) 元组
+        """
+        self.tool_id = tool_id
+        self.spec = spec
+        self.min_processes, self.max_processes, self.idle_timeout, self.max_inflight = limits
+        self.processes = []
+        self.spawning = 0
+        self._cond = threading.Condition()
+
+    def configure(self, limits):
+        """
+        更新池大小限制
+
+        Args:
+            limits: 同构造函数
+        """
+        with self._cond:
+            self.min_processes, self.max_processes, self.idle_timeout, self.max_inflight = limits
+            self._cond.notify_all()
+
+    def _spawn(self):
+        """启动一个新进程（不持有锁）"""
+        return ToolProcess(self.tool_id, **self.spec).start()
+
+    def _prune(self):
+        """移除已退出的进程（需持有锁）"""
+        dead = [process for process in self.processes if not process.is_alive()]
+        for process in dead:
+            self.processes.remove(process)
+            process.stop()
+
+    def ensure_min(self):
+        """补足最少进程数（用于激活时预热和回收线程补位）"""
+        while True:
+            with self._cond:
+                self._prune()
+                if len(self.processes) + self.spawning >= self.min_processes:
+                    return
+                self.spawning += 1
+            self._add(self._spawn_counted())
+
+    def _spawn_counted(self):
+        """启动进程，并在结束时减少正在启动的计数"""
+        try:
+            return self._spawn()
+        finally:
+            with self._cond:
+                self.spawning -= 1
+                self._cond.notify_all()
+
+    def _add(self, process):
+        """加入新启动的进程"""
+        with self._cond:
+            self.processes.append(process)
+            self._cond.notify_all()
+
+    def acquire(self):
+        """
+        选择一个进程执行调用，必要时扩容
+
+        Returns:
+            ToolProcess实例
+        """
+        deadline = time.monotonic() + Config.TOOL_START_TIMEOUT
+        with self._cond:
+            while True:
+                self._prune()
+                best = min(self.processes, key=lambda process: process.in_flight, default=None)
+                can_spawn = len(self.processes) + self.spawning < self.max_processes
+
+                if best is not None and (best.in_flight < self.max_inflight or not can_spawn):
+                    best.last_used = time.monotonic()
+                    return best
+                if can_spawn:
+                    self.spawning += 1
+                    break
+
+                # 没有可用进程且其他线程正在启动，等待其完成
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ToolProcessError('等待工具进程启动超时')
+                self._cond.wait(remaining)
+
+        process = self._spawn_counted()
+        self._add(process)
+        return process
+
+    def remove(self, process):
+        """
+        从池中移除进程（不停止进程）
+
+        Args:
+            process: ToolProcess实例
+        """
+        with self._cond:
+            if process in self.processes:
+                self.processes.remove(process)
+
+    def reap(self):
+        """
+        停止空闲超时的多余进程
+
+        Returns:
+            停止的进程数
+        """
+        with self._cond:
+            self._prune()
+            idle = sorted(
+                (process for process in self.processes if process.idle_seconds() >= self.idle_timeout),
+                key=lambda process: process.idle_seconds(),
+                reverse=True
+            )
+            surplus = max(0, len(self.processes) - self.min_processes)
+            reaped = idle[:surplus]
+            for process in reaped:
+                self.processes.remove(process)
+
+        for process in reaped:
+            process.stop()
+        return len(reaped)
+
+    def stop(self):
+        """停止池中所有进程"""
+        with self._cond:
+            processes, self.processes = self.processes, []
+        for process in processes:
+            process.stop()
+
+    def get(self):
+        """
+        获取任一运行中的进程
+
+        Returns:
+            ToolProcess实例，没有时返回None
+        """
+        with self._cond:
+            for process in self.processes:
+                if process.is_alive():
+                    return process
+        return None
+
+    def alive(self):
+        """
+        获取所有运行中的进程
+
+        Returns:
+            ToolProcess实例列表
+        """
+        with self._cond:
+            return [process for process in self.processes if process.is_alive()]
+
+    def status(self):
+        """进程池状态"""
+        with self._cond:
+            processes = [
+                {
+                    'pid': process.pid,
+                    'in_flight': process.in_flight,
+                    'idle_seconds': round(process.idle_seconds(), 1)
+                }
+                for process in self.processes if process.is_alive()
+            ]
+            return {
+                'processes': processes,
+                'spawning': self.spawning,
+                'min_processes': self.min_processes,
+                'max_processes': self.max_processes
+            }
+
+
+class ProcessRegistry:
+    """工具进程注册表，按工具ID管理预热进程池，并在后台回收空闲进程"""
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stopping = threading.Event()
+
+    @staticmethod
+    def get_limits(tool):
+        """
+        读取工具配置中的进程池限制
+
+        工具配置示例：{"min_processes": 1, "max_processes": 4, "idle_timeout": 300, "process_max_inflight": 8}
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            (最少进程数, 最多进程数, 空闲回收秒数, 单进程最大并发请求数) 元组
+        """
+        config = tool.get_config()
+        try:
+            min_processes = max(0, int(config.get('min_processes', Config.TOOL_POOL_MIN)))
+            max_processes = max(1, min_processes, int(config.get('max_processes', Config.TOOL_POOL_MAX)))
+            idle_timeout = max(0.0, float(config.get('idle_timeout', Config.TOOL_POOL_IDLE_TIMEOUT)))
+            max_inflight = max(1, int(config.get('process_max_inflight', Config.TOOL_POOL_MAX_INFLIGHT)))
+        except (TypeError, ValueError):
+            return (Config.TOOL_POOL_MIN, max(Config.TOOL_POOL_MIN, Config.TOOL_POOL_MAX),
+                    Config.TOOL_POOL_IDLE_TIMEOUT, Config.TOOL_POOL_MAX_INFLIGHT)
+        return min_processes, max_processes, idle_timeout, max_inflight
+
+    def _get_pool(self, tool):
+        """获取或创建工具的进程池，并同步当前配置的限制"""
+        limits = self.get_limits(tool)
+        with self._lock:
+            pool = self._pools.get(tool.id)
+            if pool is None:
+                pool = ToolPool(tool.id, ToolProcess.spec_from_tool(tool), limits)
+                self._pools[tool.id] = pool
+            self._ensure_reaper()
+        if (pool.min_processes, pool.max_processes, pool.idle_timeout, pool.max_inflight) != limits:
+            pool.configure(limits)
+        return pool
+
+    def get(self, tool_id):
+        """
+        获取运行中的工具进程
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            ToolProcess实例，不存在或已退出返回None
+        """
+        with self._lock:
+            pool = self._pools.get(tool_id)
+        return pool.get() if pool else None
+
+    def processes(self, tool_id):
+        """
+        获取工具所有运行中的进程
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            ToolProcess实例列表
+        """
+        with self._lock:
+            pool = self._pools.get(tool_id)
+        return pool.alive() if pool else []
+
+    def start(self, tool):
+        """
+        预热工具进程池：启动到最少进程数（至少一个，用于验证命令可用）
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            ToolProcess实例
+        """
+        pool = self._get_pool(tool)
+        pool.ensure_min()
+        return pool.get() or pool.acquire()
+
+    def acquire(self, tool):
+        """
+        获取用于本次调用的工具进程，池中没有进程时按需启动
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            ToolProcess实例
+        """
+        return self._get_pool(tool).acquire()
+
+    def recycle(self, tool_id, process):
+        """
+        回收卡死的工具进程：立即从进程池移除，并在后台终止其进程组
+
+        Args:
+            tool_id: 工具ID
+            process: 要回收的ToolProcess实例
+        """
+        with self._lock:
+            pool = self._pools.get(tool_id)
+        if pool:
+            pool.remove(process)
+        threading.Thread(
+            target=process.stop,
+            kwargs={'timeout': Config.TOOL_KILL_GRACE},
+            name=f"tool-{tool_id}-recycle",
+            daemon=True
+        ).start()
+
+    def release_abandoned(self, tool_id, process):
+        """
+        处理请求超时或被取消后的工具进程
+
+        调用方已通过notifications/cancelled取消该请求。进程上没有其他进行中的请求时直接回收；
+        否则在后台用ping探测，TOOL_CANCEL_GRACE秒内仍无响应才回收，避免同一进程上的其他调用连带失败。
+
+        Args:
+            tool_id: 工具ID
+            process: 被放弃请求所在的ToolProcess实例
+        """
+        if not process.in_flight:
+            self.recycle(tool_id, process)
+            return
+        threading.Thread(
+            target=self._probe,
+            args=(tool_id, process),
+            name=f"tool-{tool_id}-probe",
+            daemon=True
+        ).start()
+
+    def _probe(self, tool_id, process):
+        """探测进程是否仍有响应，无响应时回收"""
+        try:
+            process.request('ping', timeout=Config.TOOL_CANCEL_GRACE)
+        except MCPTimeoutError:
+            self.recycle(tool_id, process)
+        except Exception:
+            # 返回错误说明进程仍有响应；已退出的进程由进程池清理
+            pass
+
+    def stop(self, tool_id):
+        """
+        停止工具的所有进程
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            存在进程池返回True，否则返回False
+        """
+        with self._lock:
+            pool = self._pools.pop(tool_id, None)
+        if not pool:
+            return False
+        pool.stop()
+        return True
+
+    def stop_all(self):
+        """停止所有工具进程和回收线程"""
+        self._stopping.set()
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.stop()
+
+    def status(self, tool_id):
+        """
+        获取进程运行信息
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            进程信息字典
+        """
+        with self._lock:
+            pool = self._pools.get(tool_id)
+        if not pool:
+            return {'running': False, 'pid': None, 'processes': []}
+
+        status = pool.status()
+        status['running'] = bool(status['processes'])
+        status['pid'] = status['processes'][0]['pid'] if status['processes'] else None
+        return status
+
+    def _ensure_reaper(self):
+        """按需启动后台回收线程（需持有锁）"""
+        if self._reaper is None or not self._reaper.is_alive():
+            self._stopping.clear()
+            self._reaper = threading.Thread(target=self._reap_loop, name='tool-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        """定期停止空闲进程，并把进程数补足到最少进程数"""
+        while not self._stopping.wait(Config.TOOL_POOL_REAP_INTERVAL):
+            with self._lock:
+                pools = list(self._pools.values())
+            for pool in pools:
+                try:
+                    pool.reap()
+                    pool.ensure_min()
+                except Exception:
+                    # 启动失败时等待下一轮
+                    pass
+
+
+# 全局进程注册表
+process_registry = ProcessRegistry()
+
+# 应用退出时停止所有工具进程
+atexit.register(process_registry.stop_all)
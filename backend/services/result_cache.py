@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from backend.config import Config
+
+
+class ResultCache:
+    """
+    工具调用结果缓存
+
+    适用于结果只取决于参数的确定性工具，需要在工具配置中开启：
+    {"cache": {"enabled": true, "ttl": 300}}
+    缓存键由工具ID、工具配置、工具命令和规范化后的参数计算得出，
+    条目按TTL过期，并在条目数或总大小超过上限时按LRU淘汰。
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, default_ttl=None):
+        """
+        初始化结果缓存
+
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大总字节数（按结果JSON长度估算）
+            default_ttl: 默认过期秒数
+        """
+        self.max_entries = max_entries or Config.RESULT_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.RESULT_CACHE_MAX_BYTES
+        self.default_ttl = default_ttl or Config.RESULT_CACHE_TTL
+        # 缓存键 -> (工具ID, 过期时间, 结果, 字节数)
+        self._entries = OrderedDict()
+        # 工具ID -> 缓存键集合，用于按工具失效
+        self._tool_keys = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_policy(self, tool):
+        """
+        获取工具的缓存策略
+
+        Args:
+            tool: 工具实例
+
+        Returns:
+            开启缓存时返回TTL秒数，否则返回None
+        """
+        policy = tool.get_config().get('cache')
+        if policy is True:
+            return self.default_ttl
+        if isinstance(policy, dict) and policy.get('enabled'):
+            try:
+                return float(policy.get('ttl') or self.default_ttl)
+            except (TypeError, ValueError):
+                return self.default_ttl
+        return None
+
+    @staticmethod
+    def make_key(tool, params):
+        """
+        计算缓存键
+
+        Args:
+            tool: 工具实例
+            params: 调用参数
+
+        Returns:
+            缓存键字符串
+        """
+        payload = json.dumps(
+            [tool.id, tool.get_config(), tool.command, params or {}],
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            (是否命中, 结果) 元组
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[2]
+
+    def set(self, key, tool_id, result, ttl=None):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            tool_id: 工具ID
+            result: 调用结果
+            ttl: 过期秒数
+        """
+        try:
+            size = len(json.dumps(result, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            return
+        # 单个结果超过总容量时不缓存
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (tool_id, expires_at, result, size)
+            self._tool_keys.setdefault(tool_id, set()).add(key)
+            self._bytes += size
+
+            # 按LRU顺序淘汰直到满足容量限制
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tool_id):
+        """
+        使指定工具的缓存全部失效
+
+        Args:
+            tool_id: 工具ID
+
+        Returns:
+            移除的条目数
+        """
+        with self._lock:
+            keys = self._tool_keys.pop(tool_id, set())
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry:
+                    self._bytes -= entry[3]
+            return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._tool_keys.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        """移除单个条目（需持有锁）"""
+        tool_id, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._tool_keys.get(tool_id)
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._tool_keys[tool_id]
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes}
+
+
+# 全局结果缓存
+result_cache = ResultCache()
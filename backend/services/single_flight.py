@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+from backend.services.process_manager import ToolTimeoutError
+
+
+class _Call:
+    """进行中的一次调用"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    相同请求合并执行
+
+    同一键的调用正在执行时，后到的调用方不再重复执行，
+    而是等待并共享第一个调用的结果（或异常）。
+    每个等待方按自己的超时等待，超时后单独返回ToolTimeoutError，不影响正在执行的调用。
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """
+        执行调用，相同键的并发调用只执行一次
+
+        Args:
+            key: 调用键
+            fn: 无参数的执行函数
+            timeout: 等待其他调用方结果的最长秒数，None表示一直等待
+
+        Returns:
+            (结果, 异常, 是否为合并的调用) 元组，执行成功时异常为None
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            if not call.event.wait(timeout):
+                return None, ToolTimeoutError(f"等待合并请求的结果超时（{timeout}秒）"), True
+            return call.result, call.error, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result, call.error, False
+
+    def in_flight(self):
+        """进行中的调用数量"""
+        with self._lock:
+            return len(self._calls)
+
+
+# 全局请求合并器
+single_flight = SingleFlight()
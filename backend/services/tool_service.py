@@ -2,13 +2,26 @@
 # -*- coding: utf-8 -*-
 import os
 import json
+import uuid
+import queue
 import subprocess
 import threading
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeoutError
+from backend.config import Config
 from backend.models.tool import Tool
 from backend.models.log import Log
 from backend.models.db import db
+from backend.services.process_manager import process_registry, ToolTimeoutError, ToolCancelledError
+from backend.services.result_cache import result_cache
+from backend.services.single_flight import single_flight
+from backend.services.bulkhead import bulkhead_registry, ToolBusyError
+from backend.services.health_monitor import health_monitor
+from backend.services.circuit_breaker import circuit_breakers, CircuitOpenError
+from backend.services.invoke_stats import invoke_stats
+from backend.services.log_writer import log_writer
+from backend.services.log_sampler import log_sampler
 
 class ToolService:
     """MCP工具服务类，负责工具的启动、停止和调用"""
@@ -28,20 +41,19 @@ class ToolService:
         if not tool:
             return False
         
-        # 如果工具已经是活跃状态，直接返回成功
-        if tool.status == 'active':
+        # 如果工具已经是活跃状态且进程在运行，直接返回成功
+        if tool.status == 'active' and process_registry.get(tool.id):
             return True
         
         try:
-            # 获取工具配置
-            config = tool.get_config()
-            
-            # TODO: 实现实际的工具启动逻辑
-            # 这里仅作为示例，模拟工具启动
+            # 预热工具进程池并完成MCP握手，手动启动时重置熔断器
+            process_registry.start(tool)
+            circuit_breakers.reset(tool.id)
             
             # 更新工具状态
             tool.status = 'active'
             db.session.commit()
+            health_monitor.set_status(tool.id, 'active')
             
             # 记录日志
             log = Log(
@@ -49,8 +61,7 @@ class ToolService:
                 tool_id=tool.id,
                 level='info'
             )
-            db.session.add(log)
-            db.session.commit()
+            log_writer.write(log)
             
             return True
         except Exception as e:
@@ -64,8 +75,7 @@ class ToolService:
                 tool_id=tool.id,
                 level='error'
             )
-            db.session.add(log)
-            db.session.commit()
+            log_writer.write(log)
             
             return False
     
@@ -84,20 +94,18 @@ class ToolService:
         if not tool:
             return False
         
-        # 如果工具已经是非活跃状态，直接返回成功
-        if tool.status == 'inactive':
+        # 如果工具已经是非活跃状态且没有运行中的进程，直接返回成功
+        if tool.status == 'inactive' and not process_registry.get(tool.id):
             return True
         
         try:
-            # 获取工具配置
-            config = tool.get_config()
-            
-            # TODO: 实现实际的工具停止逻辑
-            # 这里仅作为示例，模拟工具停止
+            # 终止工具进程
+            process_registry.stop(tool.id)
             
             # 更新工具状态
             tool.status = 'inactive'
             db.session.commit()
+            health_monitor.set_status(tool.id, 'inactive')
             
             # 记录日志
             log = Log(
@@ -105,8 +113,7 @@ class ToolService:
                 tool_id=tool.id,
                 level='info'
             )
-            db.session.add(log)
-            db.session.commit()
+            log_writer.write(log)
             
             return True
         except Exception as e:
@@ -116,19 +123,23 @@ class ToolService:
                 tool_id=tool.id,
                 level='error'
             )
-            db.session.add(log)
-            db.session.commit()
+            log_writer.write(log)
             
             return False
     
     @staticmethod
-    def invoke_tool(tool_id, params=None):
+    def invoke_tool(tool_id, params=None, caller=None, record=True, timeout=None, cancel_token=None):
         """
         调用工具
         
         Args:
             tool_id: 工具ID
             params: 调用参数
+            caller: 调用者信息
+            record: 是否立即写入调用统计和日志；为False时不写库，
+                未保存的日志通过返回值的log字段交给调用方批量写入
+            timeout: 本次调用的超时秒数，不超过工具配置的超时
+            cancel_token: 取消令牌，取消时终止进行中的调用
             
         Returns:
             调用结果字典
@@ -144,73 +155,576 @@ class ToolService:
         # 记录开始时间
         start_time = time.time()
         
+        # 开启结果缓存的工具先查缓存，命中时不访问工具进程
+        cache_ttl = result_cache.get_policy(tool)
+        cache_key = result_cache.make_key(tool, params) if cache_ttl else None
+        cache_hit, result = result_cache.get(cache_key) if cache_key else (False, None)
+        
+        coalesced = False
+        queue_time = None
+        
+        # 熔断器打开时快速失败，不占用执行槽位，也不写日志
+        if not cache_hit:
+            breaker = circuit_breakers.get(tool)
+            if breaker is not None and breaker.is_open():
+                return ToolService._circuit_open_response(tool, breaker.retry_after(), start_time)
+        
         try:
-            # 获取工具配置
-            config = tool.get_config()
+            if not cache_hit:
+                call_timeout = ToolService._get_timeout(tool, timeout)
+                execute = lambda: ToolService._execute(tool, params, cache_key, cache_ttl, call_timeout, cancel_token)
+                
+                # 相同工具和参数的调用正在执行时，等待并共享其结果；
+                # 可取消的调用单独执行，避免取消波及其他调用方
+                if cancel_token is None and tool.get_config().get('coalesce', True):
+                    flight_key = cache_key or result_cache.make_key(tool, params)
+                    outcome, error, coalesced = single_flight.do(flight_key, execute, call_timeout)
+                    if error is not None:
+                        raise error
+                    result, queue_time = outcome
+                else:
+                    result, queue_time = execute()
             
-            # TODO: 实现实际的工具调用逻辑
-            # 这里仅作为示例，模拟工具调用
-            result = {'status': 'success', 'data': {}}
+            # 计算执行时间（毫秒），不含排队等待时间
+            duration = ToolService._elapsed_ms(start_time, queue_time)
             
-            # 计算执行时间（毫秒）
-            duration = int((time.time() - start_time) * 1000)
+            message = f"工具 '{tool.name}' 调用成功"
+            if cache_key:
+                message += '（缓存命中）' if cache_hit else '（缓存未命中）'
+            if coalesced:
+                message += '（合并请求）'
             
-            # 更新工具调用信息
-            tool.last_invoked_at = datetime.utcnow()
-            tool.invoke_count += 1
-            db.session.commit()
+            log = Log(
+                message=message,
+                tool_id=tool.id,
+                level='info',
+                params=params,
+                result=result,
+                duration=duration,
+                queue_time=queue_time,
+                caller=caller,
+                cache_status=('hit' if cache_hit else 'miss') if cache_key else None
+            )
+            response = {
+                'success': True,
+                'result': result,
+                'duration': duration,
+                'queue_time': queue_time,
+                'cached': cache_hit,
+                'coalesced': coalesced
+            }
+        except ToolBusyError as e:
+            # 排队已满时立即拒绝，由调用方稍后重试，不写日志
+            return {
+                'success': False,
+                'error': str(e),
+                'busy': True,
+                'retry_after': e.retry_after,
+                'duration': int((time.time() - start_time) * 1000)
+            }
+        except CircuitOpenError as e:
+            # 半开状态的探测名额已用完
+            return ToolService._circuit_open_response(tool, e.retry_after, start_time)
+        except Exception as e:
+            # 计算执行时间（毫秒），不含排队等待时间
+            queue_time = getattr(e, 'queue_time', queue_time)
+            duration = ToolService._elapsed_ms(start_time, queue_time)
+            
+            message = f"工具 '{tool.name}' 调用失败: {str(e)}"
+            if coalesced:
+                message += '（合并请求）'
             
-            # 记录日志
             log = Log(
-                message=f"工具 '{tool.name}' 调用成功",
+                message=message,
+                tool_id=tool.id,
+                level='error',
+                params=params,
+                duration=duration,
+                queue_time=queue_time,
+                caller=caller,
+                cache_status=('hit' if cache_hit else 'miss') if cache_key else None
+            )
+            response = {'success': False, 'error': str(e), 'duration': duration, 'queue_time': queue_time}
+            if isinstance(e, ToolTimeoutError):
+                response['timeout'] = True
+            elif isinstance(e, ToolCancelledError):
+                response['cancelled'] = True
+        
+        if not record:
+            response['log'] = log
+            return response
+        
+        ToolService._record(tool, log, response['success'])
+        
+        return response
+    
+    @staticmethod
+    def _circuit_open_response(tool, retry_after, start_time):
+        """
+        构建熔断快速失败的响应
+        
+        Args:
+            tool: 工具实例
+            retry_after: 建议重试等待秒数
+            start_time: 开始时间（time.time()）
+            
+        Returns:
+            调用结果字典
+        """
+        return {
+            'success': False,
+            'error': f"工具 '{tool.name}' 近期失败过多，已暂时熔断，请稍后重试",
+            'circuit_open': True,
+            'retry_after': retry_after,
+            'duration': int((time.time() - start_time) * 1000)
+        }
+    
+    @staticmethod
+    def _record(tool, log, success):
+        """
+        提交调用统计和日志，均不在调用线程中写库
+        
+        Args:
+            tool: 工具实例
+            log: 未保存的日志实例
+            success: 调用是否成功
+        """
+        # 调用统计在内存中累加，由invoke_stats定期批量写入
+        if success:
+            invoke_stats.record(tool.id)
+        
+        # 按采样策略丢弃的日志只计数，其余交给log_writer异步批量写入
+        if log_sampler.admit(tool, log):
+            log_writer.write(log)
+    
+    @staticmethod
+    def stream_tool(tool_id, params=None, caller=None, timeout=None):
+        """
+        流式调用工具，边执行边产出事件
+        
+        依次产出 (事件名, 数据) 元组：
+        - start: 已获得执行槽位并发出请求
+        - progress: 工具的notifications/progress进度通知
+        - content: 结果中的一个内容项，超长文本按STREAM_CHUNK_SIZE拆分为多个事件
+        - result: 调用结束（不含内容本身）
+        - error: 调用失败；第一个事件即为error时表示调用未开始（busy为True时应稍后重试）
+        进度通知经有界队列转发，队列满时丢弃多余的进度事件，内存占用不随输出大小增长。
+        
+        Args:
+            tool_id: 工具ID
+            params: 调用参数
+            caller: 调用者信息
+            timeout: 本次调用的超时秒数，不超过工具配置的超时
+            
+        Yields:
+            (事件名, 数据字典) 元组
+        """
+        tool = Tool.query.get(tool_id)
+        if not tool:
+            yield 'error', {'error': '工具不存在'}
+            return
+        
+        if tool.status != 'active':
+            yield 'error', {'error': '工具未激活'}
+            return
+        
+        start_time = time.time()
+        breaker = circuit_breakers.get(tool)
+        if breaker is not None and breaker.is_open():
+            response = ToolService._circuit_open_response(tool, breaker.retry_after(), start_time)
+            yield 'error', {'error': response['error'], 'circuit_open': True, 'retry_after': response['retry_after']}
+            return
+        
+        bulkhead = bulkhead_registry.get(tool)
+        try:
+            queue_time = int(bulkhead.acquire() * 1000)
+            acquired_at = time.monotonic()
+        except ToolBusyError as e:
+            yield 'error', {'error': str(e), 'busy': True, 'retry_after': e.retry_after}
+            return
+        
+        if breaker is not None and not breaker.allow():
+            bulkhead.release()
+            response = ToolService._circuit_open_response(tool, breaker.retry_after(), start_time)
+            yield 'error', {'error': response['error'], 'circuit_open': True, 'retry_after': response['retry_after']}
+            return
+        breaker_pending = breaker is not None
+        
+        progress = queue.Queue(maxsize=Config.STREAM_QUEUE_SIZE)
+        progress_token = uuid.uuid4().hex
+        dropped = 0
+        
+        def on_notification(method, notification):
+            nonlocal dropped
+            if method == 'notifications/progress' and notification.get('progressToken') == progress_token:
+                if not ToolService._put_nowait(progress, notification):
+                    dropped += 1
+        
+        process = None
+        request_id = None
+        future = None
+        try:
+            process = process_registry.acquire(tool)
+            process.client.add_notification_handler(on_notification)
+            name, arguments = ToolService._build_call(tool, params)
+            request_id, future = process.start_call(name, arguments, progress_token=progress_token)
+            
+            # 调用结束时放入空标记唤醒等待（队列已满时由下方的done检查兜底）
+            future.add_done_callback(lambda _: ToolService._put_nowait(progress, None))
+            
+            yield 'start', {'tool_id': tool.id, 'request_id': request_id, 'queue_time': queue_time}
+            
+            call_timeout = ToolService._get_timeout(tool, timeout)
+            deadline = time.monotonic() + call_timeout
+            
+            # 转发进度通知，直到调用结束且队列已取空
+            while not (future.done() and progress.empty()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not future.done():
+                    process.client.cancel(request_id, '调用超时')
+                    process_registry.release_abandoned(tool.id, process)
+                    raise ToolTimeoutError(f"工具调用超时（{call_timeout}秒），已取消请求")
+                try:
+                    notification = progress.get(timeout=max(0.01, min(remaining, Config.STREAM_HEARTBEAT_INTERVAL)))
+                except queue.Empty:
+                    if time.monotonic() < deadline:
+                        yield 'heartbeat', {}
+                    continue
+                if notification is None:
+                    continue
+                yield 'progress', {
+                    'progress': notification.get('progress'),
+                    'total': notification.get('total'),
+                    'message': notification.get('message')
+                }
+            
+            result = future.result()
+            if breaker_pending:
+                breaker.record(True, (time.time() - start_time) * 1000 - queue_time)
+                breaker_pending = False
+            
+            # 逐项输出结果内容，避免拼出一个完整的大响应体
+            content = result.get('content', []) if isinstance(result, dict) else []
+            for index, item in enumerate(content):
+                text = item.get('text') if isinstance(item, dict) else None
+                if isinstance(text, str) and len(text) > Config.STREAM_CHUNK_SIZE:
+                    for offset in range(0, len(text), Config.STREAM_CHUNK_SIZE):
+                        yield 'content', {
+                            'index': index,
+                            'type': item.get('type', 'text'),
+                            'text': text[offset:offset + Config.STREAM_CHUNK_SIZE],
+                            'offset': offset,
+                            'final': offset + Config.STREAM_CHUNK_SIZE >= len(text)
+                        }
+                else:
+                    yield 'content', {'index': index, 'item': item, 'final': True}
+            
+            duration = ToolService._elapsed_ms(start_time, queue_time)
+            is_error = bool(result.get('isError')) if isinstance(result, dict) else False
+            
+            # 先记录日志再产出最后一个事件，调用方收到后关闭生成器时日志不会丢失
+            log = Log(
+                message=f"工具 '{tool.name}' 流式调用成功",
                 tool_id=tool.id,
                 level='info',
                 params=params,
                 result=result,
-                duration=duration
+                duration=duration,
+                queue_time=queue_time,
+                caller=caller
             )
-            db.session.add(log)
-            db.session.commit()
+            ToolService._record(tool, log, True)
             
-            return {'success': True, 'result': result, 'duration': duration}
+            yield 'result', {
+                'success': True,
+                'is_error': is_error,
+                'content_count': len(content),
+                'dropped_progress': dropped,
+                'duration': duration,
+                'queue_time': queue_time
+            }
         except Exception as e:
-            # 计算执行时间（毫秒）
-            duration = int((time.time() - start_time) * 1000)
+            duration = ToolService._elapsed_ms(start_time, queue_time)
+            if breaker_pending:
+                breaker.record(False, duration)
+                breaker_pending = False
             
-            # 记录错误日志
+            # 路由收到error事件后会关闭生成器，必须在产出事件之前记录日志
             log = Log(
-                message=f"工具 '{tool.name}' 调用失败: {str(e)}",
+                message=f"工具 '{tool.name}' 流式调用失败: {str(e)}",
                 tool_id=tool.id,
                 level='error',
                 params=params,
-                duration=duration
+                duration=duration,
+                queue_time=queue_time,
+                caller=caller
             )
-            db.session.add(log)
-            db.session.commit()
+            ToolService._record(tool, log, False)
+            
+            yield 'error', {'error': str(e), 'duration': duration}
+        finally:
+            # 客户端提前断开时取消工具端的请求
+            if future is not None and not future.done():
+                process.client.cancel(request_id, '客户端已断开')
+            if process is not None and process.client is not None:
+                process.client.remove_notification_handler(on_notification)
+            if breaker_pending:
+                breaker.release()
+            bulkhead.release(time.monotonic() - acquired_at)
+    
+    @staticmethod
+    def _put_nowait(buffer, item):
+        """
+        非阻塞放入队列
+        
+        Args:
+            buffer: 队列
+            item: 元素
+            
+        Returns:
+            成功返回True，队列已满返回False
+        """
+        try:
+            buffer.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+    
+    @staticmethod
+    def _execute(tool, params, cache_key=None, cache_ttl=None, timeout=None, cancel_token=None):
+        """
+        在工具的并发槽位内通过工具进程执行一次调用
+        
+        超时或被取消时终止工具的进程组并从注册表中回收，下次调用重新启动进程。
+        
+        Args:
+            tool: 工具实例
+            params: 调用参数
+            cache_key: 结果缓存键，为None时不写缓存
+            cache_ttl: 缓存过期秒数
+            timeout: 超时秒数
+            cancel_token: 取消令牌
+            
+        Returns:
+            (调用结果, 排队等待毫秒数) 元组
+        """
+        bulkhead = bulkhead_registry.get(tool)
+        breaker = circuit_breakers.get(tool)
+        
+        with bulkhead.slot() as waited:
+            queue_time = int(waited * 1000)
+            
+            # 排队期间熔断器可能已打开；半开状态下只放行有限的探测调用
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError('工具已熔断', breaker.retry_after())
+            started = time.monotonic()
+            
+            try:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise ToolCancelledError('调用已取消')
+                
+                # 从预热进程池选择进程，池为空（如服务重启后）时按需启动
+                process = process_registry.acquire(tool)
+                
+                # 通过MCP tools/call调用工具
+                name, arguments = ToolService._build_call(tool, params)
+                request_id, future = process.start_call(name, arguments)
+                if cancel_token is not None:
+                    cancel_token.add_callback(lambda: process.client.cancel(request_id, '调用已取消'))
+                
+                try:
+                    result = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    process.client.cancel(request_id, '调用超时')
+                    process_registry.release_abandoned(tool.id, process)
+                    raise ToolTimeoutError(f"工具调用超时（{timeout}秒），已取消请求")
+                except CancelledError:
+                    process_registry.release_abandoned(tool.id, process)
+                    raise ToolCancelledError('调用已取消')
+            except Exception as e:
+                # 取消不代表工具故障，只归还探测名额；其余异常计为失败
+                if breaker is not None:
+                    if isinstance(e, ToolCancelledError):
+                        breaker.release()
+                    else:
+                        breaker.record(False, (time.monotonic() - started) * 1000)
+                # 让调用方在失败时也能区分排队时间和执行时间
+                e.queue_time = queue_time
+                raise
+            
+            if breaker is not None:
+                breaker.record(True, (time.monotonic() - started) * 1000)
+        
+        # 只缓存成功的结果
+        if cache_key and not (isinstance(result, dict) and result.get('isError')):
+            result_cache.set(cache_key, tool.id, result, cache_ttl)
+        
+        return result, queue_time
+    
+    @staticmethod
+    def _get_timeout(tool, timeout=None):
+        """
+        计算调用超时秒数
+        
+        工具配置中的timeout优先于全局默认值，单次调用指定的超时不能超过该值。
+        
+        Args:
+            tool: 工具实例
+            timeout: 单次调用指定的超时秒数
+            
+        Returns:
+            超时秒数
+        """
+        try:
+            tool_timeout = float(tool.get_config().get('timeout') or Config.TOOL_CALL_TIMEOUT)
+        except (TypeError, ValueError):
+            tool_timeout = Config.TOOL_CALL_TIMEOUT
+        if timeout:
+            return min(float(timeout), tool_timeout)
+        return tool_timeout
+    
+    @staticmethod
+    def _elapsed_ms(start_time, queue_time=None):
+        """
+        计算执行毫秒数，扣除排队等待时间
+        
+        Args:
+            start_time: 开始时间（time.time()）
+            queue_time: 排队等待毫秒数
+            
+        Returns:
+            执行毫秒数
+        """
+        elapsed = int((time.time() - start_time) * 1000)
+        return max(0, elapsed - (queue_time or 0))
+    
+    @staticmethod
+    def batch_invoke(app, items, max_workers=None, caller=None):
+        """
+        并发执行一批工具调用，调用统计和日志在全部完成后统一提交
+        
+        同一工具的批内并发不超过其隔离舱当前的空闲槽位（至少1个），
+        多出的条目在批内等待，不会因批次自身占满隔离舱的排队而被拒绝。
+        
+        Args:
+            app: Flask应用实例，工作线程在其应用上下文中执行
+            items: (工具ID, 调用参数) 列表
+            max_workers: 最大并发数
+            caller: 调用者信息
+            
+        Returns:
+            与items顺序一致的调用结果列表
+        """
+        max_workers = max(1, min(max_workers or Config.BATCH_MAX_CONCURRENCY,
+                                 Config.BATCH_MAX_CONCURRENCY, len(items) or 1))
+        
+        limiters = {}
+        tool_ids = {tool_id for tool_id, _ in items}
+        for tool in Tool.query.filter(Tool.id.in_(tool_ids)):
+            bulkhead = bulkhead_registry.get(tool)
+            limiters[tool.id] = threading.Semaphore(max(1, bulkhead.max_concurrency - bulkhead.active))
+        
+        def run(item):
+            tool_id, params = item
+            start_time = time.time()
+            limiter = limiters.get(tool_id)
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                with app.app_context():
+                    response = ToolService.invoke_tool(tool_id, params, caller=caller, record=False)
+            finally:
+                if limiter is not None:
+                    limiter.release()
+            response['duration'] = int((time.time() - start_time) * 1000)
+            return response
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tool-batch') as executor:
+            responses = list(executor.map(run, items))
+        
+        # 合并同一工具的调用统计，交给invoke_stats批量写入
+        invoke_counts = {}
+        logs = []
+        for (tool_id, _), response in zip(items, responses):
+            log = response.pop('log', None)
+            if log is not None:
+                logs.append(log)
+            if response['success']:
+                invoke_counts[tool_id] = invoke_counts.get(tool_id, 0) + 1
+        
+        now = datetime.utcnow()
+        for tool_id, count in invoke_counts.items():
+            invoke_stats.record(tool_id, count, now)
+        
+        # 按采样策略过滤日志，工具只查询一次
+        tools = {}
+        if logs:
+            tool_ids = {log.tool_id for log in logs if log.tool_id}
+            tools = {tool.id: tool for tool in Tool.query.filter(Tool.id.in_(tool_ids))}
+        log_writer.write_many([log for log in logs if log_sampler.admit(tools.get(log.tool_id), log)])
+        
+        return responses
+    
+    @staticmethod
+    def _build_call(tool, params):
+        """
+        根据调用参数构建MCP工具调用
+        
+        参数形如 {'name': ..., 'arguments': {...}} 时按原样使用，
+        否则整个参数作为arguments，工具名取配置中的tool_name或工具名称。
+        
+        Args:
+            tool: 工具实例
+            params: 调用参数
             
-            return {'success': False, 'error': str(e), 'duration': duration}
+        Returns:
+            (MCP工具名称, 调用参数) 元组
+        """
+        params = params or {}
+        default_name = tool.get_config().get('tool_name') or tool.name
+        
+        if 'arguments' in params:
+            return params.get('name') or default_name, params.get('arguments') or {}
+        return default_name, params
     
     @staticmethod
     def check_tool_status(tool_id):
         """
         检查工具状态
         
+        优先返回后台健康探测器缓存的状态（不访问数据库），
+        尚未探测过的工具回退为读取数据库。
+        
         Args:
             tool_id: 工具ID
             
         Returns:
             工具状态信息字典
         """
+        health = health_monitor.get(tool_id)
+        if health is not None:
+            return {
+                'success': True,
+                'status': health.pop('status'),
+                'last_invoked_at': health.pop('last_invoked_at'),
+                'invoke_count': health.pop('invoke_count') + invoke_stats.pending(tool_id),
+                'health': health,
+                'process': process_registry.status(tool_id),
+                'concurrency': bulkhead_registry.stats(tool_id),
+                'circuit_breaker': circuit_breakers.stats(tool_id)
+            }
+        
         tool = Tool.query.get(tool_id)
         if not tool:
             return {'success': False, 'error': '工具不存在'}
         
-        # TODO: 实现实际的工具状态检查逻辑
-        # 这里仅作为示例，返回数据库中的状态
-        
         return {
             'success': True,
             'status': tool.status,
             'last_invoked_at': tool.last_invoked_at.isoformat() if tool.last_invoked_at else None,
-            'invoke_count': tool.invoke_count
-        } 
\ No newline at end of file
+            'invoke_count': (tool.invoke_count or 0) + invoke_stats.pending(tool.id),
+            'health': None,
+            'process': process_registry.status(tool.id),
+            'concurrency': bulkhead_registry.stats(tool.id),
+            'circuit_breaker': circuit_breakers.stats(tool.id)
+        }
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.models.db import db
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """测试用应用，使用临时目录中的SQLite数据库"""
+    directory = tmp_path_factory.mktemp('mcp')
+
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{directory / 'test.db'}"
+        HEALTH_CHECK_ENABLED = False
+
+    return create_app(Config)
+
+
+@pytest.fixture(autouse=True)
+def clean_db(app):
+    """每个测试前清空所有表"""
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    """测试客户端"""
+    return app.test_client()
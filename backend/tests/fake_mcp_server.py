@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""测试用的最小MCP stdio服务器：tools/call把参数原样返回"""
+import sys
+import json
+
+
+def send(message):
+    sys.stdout.write(json.dumps(message) + '\n')
+    sys.stdout.flush()
+
+
+for line in sys.stdin:
+    message = json.loads(line)
+    if 'id' not in message or 'method' not in message:
+        continue
+    if message['method'] == 'initialize':
+        send({'jsonrpc': '2.0', 'id': message['id'], 'result': {
+            'protocolVersion': '2024-11-05', 'capabilities': {}, 'serverInfo': {'name': 'fake', 'version': '0'}
+        }})
+    elif message['method'] == 'tools/call':
+        arguments = message['params'].get('arguments', {})
+        send({'jsonrpc': '2.0', 'id': message['id'], 'result': {
+            'content': [{'type': 'text', 'text': json.dumps(arguments)}], 'isError': False
+        }})
+    else:
+        send({'jsonrpc': '2.0', 'id': message['id'], 'result': {}})
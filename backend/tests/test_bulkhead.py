@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+from backend.services.bulkhead import Bulkhead, ToolBusyError
+
+
+def saturate(bulkhead, hold):
+    """按给定占用时长记录几次调用后占满所有槽位"""
+    for _ in range(5):
+        bulkhead.acquire()
+        bulkhead.release(hold)
+    for _ in range(bulkhead.max_concurrency):
+        bulkhead.acquire()
+
+
+def test_retry_after_defaults_to_one_second_without_history():
+    bulkhead = Bulkhead(1, 0, 0)
+    bulkhead.acquire()
+    with pytest.raises(ToolBusyError) as error:
+        bulkhead.acquire()
+    assert error.value.retry_after == 1
+
+
+def test_retry_after_follows_call_duration():
+    fast, slow = Bulkhead(2, 0, 0), Bulkhead(2, 0, 0)
+    saturate(fast, 0.5)
+    saturate(slow, 10.0)
+
+    with pytest.raises(ToolBusyError) as fast_error:
+        fast.acquire()
+    with pytest.raises(ToolBusyError) as slow_error:
+        slow.acquire()
+
+    assert fast_error.value.retry_after == 1
+    assert slow_error.value.retry_after == 5
+
+
+def test_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr('backend.config.Config.TOOL_RETRY_AFTER_MAX', 30)
+    bulkhead = Bulkhead(1, 0, 0)
+    saturate(bulkhead, 600.0)
+    with pytest.raises(ToolBusyError) as error:
+        bulkhead.acquire()
+    assert error.value.retry_after == 30
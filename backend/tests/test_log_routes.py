@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from backend.models.db import db
+from backend.models.log import Log
+from backend.routes import log_routes
+
+
+def add_logs(count):
+    """批量插入日志，每秒三条，时间相同的日志靠ID区分先后"""
+    base = datetime(2026, 1, 1)
+    db.session.execute(insert(Log), [{
+        'message': f"message {i}",
+        'level': 'info',
+        'created_at': base + timedelta(seconds=i // 3),
+        'updated_at': base
+    } for i in range(count)])
+    db.session.commit()
+
+
+def explain_plans(action):
+    """
+    执行action并对其中的每条SELECT用实际绑定的参数执行EXPLAIN QUERY PLAN
+
+    Returns:
+        查询计划列表，每个计划为步骤说明的列表
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'logs' in statement:
+            statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    plans = []
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append([row[-1] for row in cursor.fetchall()])
+    finally:
+        connection.close()
+    return plans
+
+
+def test_cursor_pages_cover_all_logs(client):
+    add_logs(250)
+    seen, cursor = [], ''
+    while True:
+        data = client.get('/api/logs/', query_string={'cursor': cursor, 'per_page': 40}).get_json()
+        seen.extend(log['id'] for log in data['logs'])
+        if not data['next_cursor']:
+            break
+        cursor = data['next_cursor']
+
+    assert len(seen) == 250
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_cursor_page_seeks_created_at_index(client):
+    add_logs(300)
+    first = client.get('/api/logs/', query_string={'cursor': '', 'per_page': 100}).get_json()
+
+    plans = explain_plans(lambda: client.get(
+        '/api/logs/', query_string={'cursor': first['next_cursor'], 'per_page': 100}
+    ))
+
+    assert plans
+    for plan in plans:
+        assert any('ix_logs_created_at' in step and 'created_at<' in step for step in plan), plan
+
+
+def test_export_reads_every_batch_by_index_range(client, monkeypatch):
+    monkeypatch.setattr(log_routes, 'EXPORT_BATCH_SIZE', 50)
+    add_logs(220)
+
+    def export():
+        response = client.get('/api/logs/export')
+        export.lines = response.get_data(as_text=True).splitlines()
+
+    plans = explain_plans(export)
+    ids = [json.loads(line)['id'] for line in export.lines]
+
+    assert len(ids) == 220
+    assert len(set(ids)) == 220
+    assert ids == sorted(ids, reverse=True)
+    # 首批没有游标条件，之后的每一批都应从上一批末尾开始范围扫描，且不再按主键逐行重新加载
+    batches = [plan for plan in plans if any('ix_logs_created_at' in step for step in plan)]
+    assert len(batches) == 5
+    assert len(plans) == len(batches) + 1
+    for plan in batches[1:]:
+        assert any('created_at<' in step for step in plan), plan
+
+
+def test_bulk_keeps_back_dated_created_at(client):
+    response = client.post('/api/logs/bulk', json=[
+        {'message': 'late report', 'created_at': '2026-01-02T03:04:05+08:00'},
+        {'message': 'from the future', 'created_at': (datetime.utcnow() + timedelta(days=1)).isoformat()},
+        {'message': 'bad time', 'created_at': 'yesterday'}
+    ])
+
+    data = response.get_json()
+    assert response.status_code == 207
+    assert data['inserted'] == 1
+    assert [error['index'] for error in data['errors']] == [1, 2]
+    log = Log.query.filter_by(message='late report').one()
+    assert log.created_at == datetime(2026, 1, 1, 19, 4, 5)
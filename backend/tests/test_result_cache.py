@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import pytest
+from backend.services.process_manager import process_registry
+from backend.services.result_cache import result_cache
+
+FAKE_SERVER = os.path.join(os.path.dirname(__file__), 'fake_mcp_server.py')
+
+
+@pytest.fixture
+def tool_id(client):
+    """开启结果缓存的已激活工具"""
+    response = client.post('/api/tools/', json={
+        'name': 'echo',
+        'type': 'network',
+        'command': f"{sys.executable} {FAKE_SERVER}",
+        'config': {'cache': {'enabled': True, 'ttl': 300}}
+    })
+    tool_id = response.get_json()['id']
+    assert client.post(f'/api/tools/{tool_id}/activate').status_code == 200
+    yield tool_id
+    process_registry.stop(tool_id)
+    result_cache.invalidate(tool_id)
+
+
+def test_invocation_logs_record_cache_status(client, tool_id):
+    for _ in range(3):
+        assert client.post(f'/api/tools/{tool_id}/invoke', json={'q': 'same'}).status_code == 200
+
+    logs = client.get('/api/logs/', query_string={'tool_id': tool_id, 'per_page': 50}).get_json()['logs']
+    statuses = sorted(log['cache_status'] for log in logs if log['cache_status'])
+    assert statuses == ['hit', 'hit', 'miss']
+    # 启动日志不是调用日志，没有缓存状态
+    assert any(log['cache_status'] is None for log in logs)
+
+
+def test_logs_filter_and_count_by_cache_status(client, tool_id):
+    for query in ('a', 'a', 'b', 'a'):
+        client.post(f'/api/tools/{tool_id}/invoke', json={'q': query})
+
+    def count(status):
+        return client.get('/api/logs/', query_string={
+            'cache_status': status, 'cursor': '', 'with_total': 'true'
+        }).get_json()['total']
+
+    assert count('hit') == 2
+    assert count('miss') == 2